@@ -2,14 +2,32 @@
 
 from __future__ import annotations
 
+import time
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import JBL4305PClient
-from .const import CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .api import JBL4305PClient, bluetooth_device_from_state, input_id_for
+from .const import (
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_SCAN_INTERVAL,
+    CONF_STALE_GRACE,
+    DATA_FLEET,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_GRACE,
+    DOMAIN,
+    LIVE_OPTIONS,
+)
 from .coordinator import JBL4305PDataUpdateCoordinator
+from .scheduler import FleetScheduler
+from .storage import JBL4305PDeviceCache
+from .transport import JBL4305PTransport
 
 PLATFORMS: list[Platform] = [Platform.SELECT, Platform.SENSOR, Platform.BUTTON]
 
@@ -17,23 +35,74 @@ PLATFORMS: list[Platform] = [Platform.SELECT, Platform.SENSOR, Platform.BUTTON]
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up JBL 4305P from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+    # Shared by all speakers: staggers their polls and bounds their requests in flight
+    fleet: FleetScheduler = hass.data.setdefault(DATA_FLEET, FleetScheduler())
+    started = time.monotonic()
 
-    session = async_get_clientsession(hass)
-    client = JBL4305PClient(entry.data[CONF_HOST], session)
+    # Dedicated keep-alive session per speaker rather than HA's shared session
+    transport = JBL4305PTransport(entry.data[CONF_HOST])
+    client = JBL4305PClient(
+        entry.data[CONF_HOST], transport.session, fleet_slots=fleet.request_slots
+    )
 
-    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-    coordinator = JBL4305PDataUpdateCoordinator(hass, client, scan_interval)
+    # Last known device facts and inputs, so setup does not wait on slow fetches
+    cache = JBL4305PDeviceCache(hass, entry.entry_id)
+    cached = await cache.async_load()
 
-    await coordinator.async_config_entry_first_refresh()
+    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    coordinator = JBL4305PDataUpdateCoordinator(
+        hass,
+        client,
+        scan_interval,
+        min_interval=entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+        max_interval=entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        cache=cache,
+        stale_grace=entry.options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE),
+        fleet=fleet,
+    )
+    coordinator.async_restore(cached)
+    # Inputs from options, else those discovered on a previous start
+    coordinator.inputs.async_set_inputs(
+        entry.options.get("available_inputs") or cached.get("available_inputs", {})
+    )
+    entry.async_on_unload(
+        coordinator.inputs.async_add_listener(
+            lambda: cache.async_update(available_inputs=coordinator.inputs.inputs)
+        )
+    )
+
+    # Registered before the first refresh so the first timed poll is already staggered
+    fleet.register(coordinator)
+    try:
+        # Only player state blocks setup; slow tiers load in the background below
+        await coordinator.async_startup_refresh()
+    except Exception:
+        fleet.unregister(coordinator)
+        await transport.async_close()
+        raise
 
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
         "coordinator": coordinator,
+        "transport": transport,
+        # What the running entry was set up with, to tell live changes from reloads
+        "applied_data": dict(entry.data),
+        "applied_options": dict(entry.options),
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    # Fills in (or confirms cached) system facts and versions once entities exist
+    entry.async_create_background_task(
+        hass, coordinator.async_complete_startup(started), f"{entry.title} startup"
+    )
+    if entry.options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES):
+        coordinator.async_start_push(entry)
+    entry.async_create_background_task(
+        hass, transport.async_keep_warm(client), f"{entry.title} keep-warm"
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     # Register services once (idempotent)
     async def _async_rediscover_inputs(call):
@@ -43,8 +112,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if target_entry_id != entry.entry_id:
             return
         client = hass.data[DOMAIN][entry.entry_id]["client"]
-        inputs = await client.discover_available_inputs()
-        # Update options with new inputs and trigger reload via update listener
+        # Explicit request: re-probe every service instead of trusting the capability cache
+        inputs = await client.discover_available_inputs(force=True)
+        # Update options with new inputs; the update listener applies them live
         new_options = dict(entry.options)
         new_options["available_inputs"] = inputs
         hass.config_entries.async_update_entry(entry, options=new_options)
@@ -68,46 +138,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if target_entry_id != entry.entry_id:
             return
 
-        client = hass.data[DOMAIN][entry.entry_id]["client"]
         coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        data = coordinator.data or {}
 
         provided_path = call.data.get("device_path")
         provided_name = call.data.get("name")
 
-        device_path = provided_path
-        device_name = provided_name
+        # Use the coordinator's player state snapshot rather than another round-trip
+        current_device = bluetooth_device_from_state(data.get("player"))
 
-        if not device_path:
-            # Prefer last seen Bluetooth device path from coordinator
-            device_path = (coordinator.data or {}).get("last_bt_device_path")
-
-        # If still missing, try current player state
-        if not device_path:
-            state = await client.get_player_state()
-            if state:
-                mr = state.get("mediaRoles", {})
-                md = mr.get("mediaData", {})
-                meta = md.get("metaData", {})
-                if meta.get("serviceID") == "bluetooth":
-                    val = mr.get("value", {})
-                    device_path = val.get("string_")
-                    device_name = device_name or mr.get("title")
+        # Prefer explicit path, then last seen Bluetooth device, then current player state
+        device_path = provided_path or data.get("last_bt_device_path")
+        if not device_path and current_device:
+            device_path = current_device["path"]
 
         if not device_path:
             # Nothing to add
             return
 
-        # Derive MAC and input id
-        mac_id = None
-        parts = device_path.split("/")
-        if len(parts) >= 5 and parts[-2].startswith("dev_"):
-            mac = parts[-2].replace("dev_", "").lower()
-            mac_id = mac.replace(":", "_").replace("_", "_")
+        device_name = None
+        if current_device and current_device["path"] == device_path:
+            device_name = current_device["name"]
 
-        input_id = f"bluetooth_{mac_id}" if mac_id else f"bluetooth_{abs(hash(device_path))}"
+        # Same input id as discovery; keep the id of an already registered device
+        input_id = coordinator.inputs.id_for_device_path(device_path) or input_id_for(
+            "bluetooth", device_path
+        )
+        if input_id == "bluetooth":
+            # Not a BlueZ device path, so there is no MAC to key it by
+            input_id = f"bluetooth_{abs(hash(device_path))}"
         friendly_name = provided_name or device_name or "Bluetooth Device"
 
-        inputs = dict(entry.options.get("available_inputs", {}))
+        inputs = dict(coordinator.inputs.inputs)
         inputs[input_id] = {
             "service_id": "bluetooth",
             "name": f"Bluetooth - {friendly_name}",
@@ -133,12 +195,44 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await entry_data["coordinator"].async_shutdown()
+        await entry_data["transport"].async_close()
+        hass.data[DATA_FLEET].unregister(entry_data["coordinator"])
 
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persistent cache when the entry is deleted."""
+    await JBL4305PDeviceCache(hass, entry.entry_id).async_remove()
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply an entry update live, or reload when it changes how the speaker is reached."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    previous = entry_data["applied_options"]
+    changed = {
+        key
+        for key in previous.keys() | entry.options.keys()
+        if previous.get(key) != entry.options.get(key)
+    }
+    if entry.data != entry_data["applied_data"] or not changed <= LIVE_OPTIONS:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    entry_data["applied_options"] = dict(entry.options)
+    # An empty list (options saved before any discovery) keeps the inputs in use
+    if "available_inputs" in changed and (inputs := entry.options.get("available_inputs")):
+        # Rebuilds the indexes; entities using the registry write state once
+        entry_data["coordinator"].inputs.async_set_inputs(inputs)
+    if changed & {CONF_SCAN_INTERVAL, CONF_MIN_SCAN_INTERVAL, CONF_MAX_SCAN_INTERVAL}:
+        entry_data["coordinator"].async_set_intervals(
+            entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+            entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        )
+    if CONF_STALE_GRACE in changed:
+        entry_data["coordinator"].async_set_stale_grace(
+            entry.options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE)
+        )
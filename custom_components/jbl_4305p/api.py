@@ -2,14 +2,247 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-import re
 import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
 import aiohttp
 
-from .const import LOGGER
+from .breaker import CIRCUIT_CLOSED, CIRCUIT_OPEN, CircuitBreaker
+from .const import (
+    CAPABILITY_NEGATIVE_TTL,
+    CAPABILITY_TTL,
+    EVENT_POLL_TIMEOUT,
+    INPUT_TYPES,
+    LOGGER,
+    MAX_CONCURRENT_REQUESTS,
+    PATH_DEVICE_NAME,
+    PATH_EVENT_MODIFY_QUEUE,
+    PATH_EVENT_POLL_QUEUE,
+    PATH_PLAYER_CONTROL,
+    PROBE_TIMEOUT,
+    READ_CACHE_TTL,
+    REQUEST_TIMEOUT,
+    SERVICE_AIRPLAY,
+    SERVICE_ROON,
+    SERVICE_SPOTIFY,
+    SERVICE_TIDAL,
+    SERVICE_UPNP,
+)
+from .index_page import IndexPageReader
+from .metrics import ENDPOINT_GET_DATA, ENDPOINT_INDEX, ENDPOINT_SET_DATA, RequestMetrics
+
+# Services detected by probing settings:/<service_id>
+PROBED_SERVICES = (SERVICE_AIRPLAY, SERVICE_SPOTIFY, SERVICE_ROON, SERVICE_TIDAL, SERVICE_UPNP)
+
+SYSTEM_INFO_PATHS = {
+    "mac": "settings:/system/primaryMacAddress",
+    "serial": "settings:/system/serialNumber",
+    "uptime": "settings:/system/deviceUptime",
+    "cast_version": "settings:/googlecast/castVersion",
+    "device_name": PATH_DEVICE_NAME,
+}
+
+
+def decode_typed_value(value: Any) -> Any:
+    """Unwrap an NSDK typed value such as {"type": "string_", "string_": "x"}.
+
+    Some responses omit ``type``; a dict with a single ``<kind>_`` key is unwrapped too.
+    """
+    if isinstance(value, dict):
+        if "type" in value:
+            return value.get(value.get("type"))
+        typed_keys = [key for key in value if key.endswith("_")]
+        if len(typed_keys) == 1:
+            return value[typed_keys[0]]
+    return value
+
+
+def bluetooth_mac_from_path(device_path: str | None) -> str | None:
+    """Extract the lowercase MAC from a BlueZ path like /org/bluez/hci0/dev_XX_XX_XX_XX_XX_XX."""
+    if not device_path:
+        return None
+    parts = device_path.split("/")
+    if len(parts) >= 5 and parts[-1].startswith("dev_"):
+        return parts[-1].replace("dev_", "").replace("_", ":").lower()
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerSnapshot:
+    """The parts of a ``player:player/data`` response the integration uses.
+
+    Decoded once per response; the raw payload (including arbitrarily large
+    metadata) is not kept. Instances are immutable and compare by value.
+    """
+
+    state: str | None = None
+    service_id: str | None = None
+    device_path: str | None = None
+    title: str | None = None
+
+    @classmethod
+    def from_state(cls, player_state: PlayerState) -> PlayerSnapshot:
+        """Decode a raw player state (or pass through an existing snapshot)."""
+        if isinstance(player_state, PlayerSnapshot):
+            return player_state
+        if not player_state:
+            return EMPTY_PLAYER_SNAPSHOT
+        media_roles = player_state.get("mediaRoles") or {}
+        meta_data = (media_roles.get("mediaData") or {}).get("metaData") or {}
+        return cls(
+            state=_as_str(player_state.get("state")),
+            service_id=_as_str(meta_data.get("serviceID")),
+            device_path=_as_str(media_roles.get("value")),
+            title=_as_str(media_roles.get("title")),
+        )
+
+    @property
+    def current_input(self) -> str | None:
+        """Return the current input ID, or None when stopped or the payload was empty."""
+        # A payload without a state still reports its service
+        if self.state == "stopped":
+            return None
+        return input_id_for(self.service_id, self.device_path)
+
+    @property
+    def bluetooth_device(self) -> dict[str, Any] | None:
+        """Return the Bluetooth device of this snapshot, see ``bluetooth_device_from_state``."""
+        if self.service_id != "bluetooth" or not self.device_path:
+            return None
+        return {
+            "path": self.device_path,
+            "mac": bluetooth_mac_from_path(self.device_path),
+            "name": self.title or "Unknown Device",
+        }
+
+
+EMPTY_PLAYER_SNAPSHOT = PlayerSnapshot()
+
+# A raw player:player/data payload or its decoded snapshot
+PlayerState = PlayerSnapshot | dict[str, Any] | None
+
+
+def _as_str(value: Any) -> str | None:
+    """Decode an NSDK typed value and return it if it is a string."""
+    value = decode_typed_value(value)
+    return value if isinstance(value, str) else None
+
+
+def bluetooth_device_from_state(player_state: PlayerState) -> dict[str, Any] | None:
+    """Return the Bluetooth device referenced by a player state snapshot, if any.
+
+    The result has ``path``, ``mac`` (None if the path is not a BlueZ device path)
+    and ``name`` keys. Playback state is not checked, so this also reports the
+    device of a paused or stopped Bluetooth session.
+    """
+    return PlayerSnapshot.from_state(player_state).bluetooth_device
+
+
+def input_id_for(service_id: str | None, device_path: str | None = None) -> str | None:
+    """Return the input ID for a service, including the device MAC for Bluetooth."""
+    if service_id == "bluetooth":
+        mac = bluetooth_mac_from_path(device_path)
+        if mac:
+            return f"bluetooth_{mac.replace(':', '_')}"
+    return service_id
+
+
+def current_input_from_state(player_state: PlayerState) -> str | None:
+    """Derive the current input ID from a player state snapshot."""
+    return PlayerSnapshot.from_state(player_state).current_input
+
+
+def switch_input_payload(service_id: str, device_path: str | None = None) -> dict[str, Any]:
+    """Build the player:player/control payload that switches to an input."""
+    if service_id == "googlecast":
+        payload = {
+            "control": "play",
+            "mediaRoles": {
+                "mediaData": {
+                    "metaData": {
+                        "live": True,
+                        "serviceID": "googlecast",
+                    }
+                },
+                "type": "audio",
+                "audioType": "audioBroadcast",
+                "title": "Chromecast built-in",
+                "icon": "skin:iconGooglecast",
+                "doNotTrack": True,
+                "description": "Chromecast built-in",
+            },
+        }
+    elif service_id == "bluetooth":
+        payload = {
+            "control": "play",
+            "mediaRoles": {
+                "type": "audio",
+                "audioType": "audioBroadcast",
+                "mediaData": {
+                    "metaData": {
+                        "serviceID": "bluetooth",
+                        "playLogicPath": "bluetooth:playlogic",
+                    }
+                },
+                "doNotTrack": True,
+            },
+        }
+
+        # Add device path if provided
+        if device_path:
+            payload["mediaRoles"]["value"] = {
+                "string_": device_path,
+                "type": "string_",
+            }
+    else:
+        # Generic service activation
+        payload = {
+            "control": "play",
+            "mediaRoles": {
+                "type": "audio",
+                "audioType": "audioBroadcast",
+                "mediaData": {
+                    "metaData": {
+                        "serviceID": service_id,
+                    }
+                },
+            },
+        }
+
+    return payload
+
+
+# Monotonic time by which requests made in the current context must finish
+_request_deadline: ContextVar[float | None] = ContextVar("jbl_4305p_request_deadline", default=None)
+# Timeout given to the request last started in this context, see _record_failure
+_granted_timeout: ContextVar[float | None] = ContextVar("jbl_4305p_granted_timeout", default=None)
+
+
+@contextmanager
+def request_deadline(budget: float) -> Iterator[None]:
+    """Give every client request made in this context the part of ``budget`` seconds left.
+
+    Tasks started inside the context (e.g. by ``asyncio.gather``) share the
+    deadline. A request that would start after it has passed raises
+    ``JBL4305PConnectionError`` without touching the network.
+    """
+    token = _request_deadline.set(time.monotonic() + budget)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def _deadline_passed() -> bool:
+    deadline = _request_deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
 
 
 class JBL4305PApiError(Exception):
@@ -20,39 +253,216 @@ class JBL4305PConnectionError(JBL4305PApiError):
     """Connection error."""
 
 
+class JBL4305PEventQueueError(JBL4305PApiError):
+    """Event queue is unsupported or no longer valid on the speaker."""
+
+
 class JBL4305PClient:
     """Client for JBL 4305P NSDK API."""
 
-    def __init__(self, host: str, session: aiohttp.ClientSession) -> None:
-        """Initialize the client."""
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        read_cache_ttl: float = READ_CACHE_TTL,
+        request_timeout: float = REQUEST_TIMEOUT,
+        probe_timeout: float = PROBE_TIMEOUT,
+        fleet_slots: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize the client.
+
+        ``fleet_slots`` is shared with the clients of other speakers to bound
+        the requests in flight across all of them.
+        """
         self.host = host
         self.session = session
         self.base_url = f"http://{host}"
+        # Bounds parallel requests to this speaker regardless of how many callers fan out
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        self._fleet_slots = fleet_slots
+        # Single-flight reads: (path, roles) -> in-flight request / recent result
+        self._read_cache_ttl = read_cache_ttl
+        self._inflight_reads: dict[tuple[str, str], asyncio.Future[list[dict[str, Any]]]] = {}
+        self._read_cache: dict[tuple[str, str], tuple[float, list[dict[str, Any]]]] = {}
+        # Bumped when a write starts and ends; reads older than it are not cached
+        self._write_generation = 0
+        self._read_hits = 0
+        self._read_misses = 0
+        # Service capability cache: service_id -> (expires, present)
+        self._capabilities: dict[str, tuple[float, bool]] = {}
+        # index.fcgi results, reused while the page is unchanged
+        self._index_reader = IndexPageReader()
+        # Fails requests fast while the speaker is asleep or off the network
+        self.breaker = CircuitBreaker()
+        self._request_timeout = request_timeout
+        self._probe_timeout = probe_timeout
+        self._probe: asyncio.Future[bool] | None = None
+        # Per-endpoint and per-path counts, errors, bytes and latency
+        self.metrics = RequestMetrics()
+
+    @asynccontextmanager
+    async def _request_slot(self) -> AsyncIterator[None]:
+        """Hold a request slot for this speaker and, when shared, one of the fleet's."""
+        async with self._request_slots:
+            if self._fleet_slots is None:
+                yield
+                return
+            async with self._fleet_slots:
+                yield
+
+    @property
+    def read_stats(self) -> dict[str, int]:
+        """Return getData coalescing counters (hits were served without a new request)."""
+        return {
+            "hits": self._read_hits,
+            "misses": self._read_misses,
+            "in_flight": len(self._inflight_reads),
+        }
 
     async def nsdk_get_data(self, path: str, roles: str = "value") -> list[dict[str, Any]]:
-        """Get data from NSDK API."""
+        """Get data from NSDK API.
+
+        Concurrent identical reads share one HTTP request, and its result is
+        reused for a short TTL. The result is shared between callers, so it
+        must not be mutated.
+        """
+        key = (path, roles)
+        cached = self._read_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._read_hits += 1
+            return cached[1]
+
+        if (request := self._inflight_reads.get(key)) is not None:
+            self._read_hits += 1
+        else:
+            self._read_misses += 1
+            request = asyncio.ensure_future(self._nsdk_get_data(path, roles))
+            self._inflight_reads[key] = request
+            request.add_done_callback(partial(self._read_done, key, self._write_generation))
+
+        # Shield so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(request)
+
+    def _read_done(self, key: tuple[str, str], generation: int, request: asyncio.Future) -> None:
+        """Drop a finished read from the in-flight table and cache its result.
+
+        A read that overlapped a write (``generation`` is older than the
+        current one) may return pre-write data, so it is not cached.
+        """
+        if self._inflight_reads.get(key) is request:
+            del self._inflight_reads[key]
+        if request.cancelled() or request.exception() is not None:
+            return
+        if generation != self._write_generation:
+            return
+        if self._read_cache_ttl > 0:
+            self._read_cache[key] = (time.monotonic() + self._read_cache_ttl, request.result())
+
+    async def _nsdk_get_data(self, path: str, roles: str) -> list[dict[str, Any]]:
+        """Perform a getData request unless the circuit is open."""
+        await self._async_check_circuit()
+        return await self._get_data_request(path, roles, self._request_timeout)
+
+    async def _get_data_request(
+        self, path: str, roles: str, timeout: float
+    ) -> list[dict[str, Any]]:
+        """Perform a getData request and record its outcome on the circuit breaker."""
         url = f"{self.base_url}/api/getData"
         params = {
             "path": path,
             "roles": roles,
-            "_nocache": str(int(time.time() * 1000)),
         }
 
         try:
-            async with self.session.get(url, params=params, timeout=10) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-
-                if isinstance(data, dict) and "error" in data:
-                    error_msg = data["error"].get("message", "Unknown error")
-                    LOGGER.debug("NSDK API error for path %s: %s", path, error_msg)
-                    return []
-
-                return data if isinstance(data, list) else []
+            async with self._request_slot():
+                timeout = self._timeout(timeout)
+                with self.metrics.time(ENDPOINT_GET_DATA, path) as timer:
+                    async with self.session.get(url, params=params, timeout=timeout) as resp:
+                        resp.raise_for_status()
+                        data = await resp.json()
+                        timer.bytes = len(await resp.read())
+                        if isinstance(data, dict) and "error" in data:
+                            # e.g. an absent service's path: answered, so not a failure
+                            timer.nsdk_error = True
         except aiohttp.ClientError as err:
+            self._record_failure(err)
             raise JBL4305PConnectionError(f"Connection error: {err}") from err
         except TimeoutError as err:
+            self._record_failure(err)
             raise JBL4305PConnectionError("Request timeout") from err
+        self.breaker.record_success()
+
+        if isinstance(data, dict) and "error" in data:
+            error_msg = data["error"].get("message", "Unknown error")
+            LOGGER.debug("NSDK API error for path %s: %s", path, error_msg)
+            return []
+
+        return data if isinstance(data, list) else []
+
+    def _timeout(self, timeout: float | None = None) -> float:
+        """Return the timeout for a request starting now, capped by the request deadline."""
+        timeout = self._request_timeout if timeout is None else timeout
+        if (deadline := _request_deadline.get()) is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise JBL4305PConnectionError("Update deadline passed before the request started")
+        timeout = min(timeout, remaining)
+        _granted_timeout.set(timeout)
+        return timeout
+
+    def _record_failure(self, err: BaseException) -> None:
+        """Count a failed request towards opening the circuit.
+
+        An HTTP error status still proves the speaker is awake, so it closes
+        the circuit instead. A timeout counts unless the request deadline cut
+        the request to less than the probe timeout, which proves nothing
+        either way. The update budget is shorter than the request timeout, so
+        most timeouts during a refresh end at the deadline.
+        """
+        if isinstance(err, aiohttp.ClientResponseError):
+            self.breaker.record_success()
+            return
+        if isinstance(err, TimeoutError) and _deadline_passed():
+            granted = _granted_timeout.get()
+            if granted is not None and granted < self._probe_timeout:
+                return
+        self.breaker.record_failure()
+
+    async def _async_check_circuit(self) -> None:
+        """Raise ``JBL4305PConnectionError`` unless requests to the speaker may run.
+
+        While the circuit is open this fails without touching the network.
+        Once it is half-open, callers share one short-timeout probe.
+        """
+        state = self.breaker.state()
+        if state == CIRCUIT_CLOSED:
+            return
+        if state == CIRCUIT_OPEN or not await self.async_probe():
+            self.breaker.rejected += 1
+            raise JBL4305PConnectionError("Speaker unreachable, circuit open")
+
+    async def async_probe(self) -> bool:
+        """Return whether the speaker answers a cheap read within the probe timeout.
+
+        Concurrent callers share one probe; its outcome opens or closes the circuit.
+        """
+        if self._probe is None:
+            self._probe = asyncio.ensure_future(self._async_probe())
+            self._probe.add_done_callback(self._probe_done)
+        return await asyncio.shield(self._probe)
+
+    async def _async_probe(self) -> bool:
+        try:
+            await self._get_data_request(PATH_DEVICE_NAME, "value", self._probe_timeout)
+        except JBL4305PConnectionError as err:
+            LOGGER.debug("Reachability probe to %s failed: %s", self.host, err)
+            return False
+        return True
+
+    def _probe_done(self, probe: asyncio.Future[bool]) -> None:
+        self._probe = None
 
     async def nsdk_set_data(self, path: str, value: Any, role: str = "activate") -> bool:
         """Set data via NSDK API."""
@@ -61,16 +471,101 @@ class JBL4305PClient:
             "path": path,
             "role": role,
             "value": json.dumps(value),
-            "_nocache": str(int(time.time() * 1000)),
         }
 
+        self._invalidate_reads()
         try:
-            async with self.session.get(url, params=params, timeout=10) as resp:
-                resp.raise_for_status()
-                return True
+            await self._async_check_circuit()
+            async with self._request_slot():
+                timeout = self._timeout()
+                with self.metrics.time(ENDPOINT_SET_DATA, path) as timer:
+                    async with self.session.get(url, params=params, timeout=timeout) as resp:
+                        resp.raise_for_status()
+                        timer.bytes = len(await resp.read())
+            self.breaker.record_success()
+            return True
+        except JBL4305PConnectionError as err:
+            LOGGER.error("Failed to set data: %s", err)
+            return False
         except aiohttp.ClientError as err:
+            self._record_failure(err)
             LOGGER.error("Failed to set data: %s", err)
             return False
+        except TimeoutError as err:
+            self._record_failure(err)
+            raise
+        finally:
+            # Any write may change what reads return, including reads that raced it
+            self._invalidate_reads()
+
+    def _invalidate_reads(self) -> None:
+        """Forget cached reads, and keep reads in flight from being cached or joined."""
+        self._write_generation += 1
+        self._read_cache.clear()
+        self._inflight_reads.clear()
+
+    async def event_subscribe(self, paths: Iterable[str], queue_id: str = "") -> str:
+        """Subscribe ``paths`` on an NSDK event queue, creating one if ``queue_id`` is empty.
+
+        Returns the queue ID to pass to ``event_poll``.
+        """
+        url = f"{self.base_url}{PATH_EVENT_MODIFY_QUEUE}"
+        params = {
+            "queueId": queue_id,
+            "subscribe": json.dumps([{"path": path, "type": "itemWithValue"} for path in paths]),
+        }
+
+        await self._async_check_circuit()
+        try:
+            async with (
+                self._request_slot(),
+                self.session.get(url, params=params, timeout=self._timeout()) as resp,
+            ):
+                self.breaker.record_success()
+                if resp.status == 404:
+                    raise JBL4305PEventQueueError("Event queue not supported by firmware")
+                resp.raise_for_status()
+                data = await resp.json()
+        except aiohttp.ClientError as err:
+            self._record_failure(err)
+            raise JBL4305PConnectionError(f"Connection error: {err}") from err
+        except TimeoutError as err:
+            self._record_failure(err)
+            raise JBL4305PConnectionError("Request timeout") from err
+
+        if not isinstance(data, str) or not data:
+            raise JBL4305PEventQueueError(f"Unexpected modifyQueue response: {data!r}")
+        return data
+
+    async def event_poll(
+        self, queue_id: str, timeout: float = EVENT_POLL_TIMEOUT
+    ) -> list[dict[str, Any]]:
+        """Long-poll an event queue for changes, returning the queued events.
+
+        Raises ``JBL4305PEventQueueError`` when the speaker no longer knows the
+        queue (e.g. after a reboot) so the caller can resubscribe.
+        """
+        url = f"{self.base_url}{PATH_EVENT_POLL_QUEUE}"
+        params = {"queueId": queue_id, "timeout": str(int(timeout * 1000))}
+
+        # The long-poll is parked on the speaker for up to ``timeout`` seconds, so
+        # it does not take one of the request slots used for regular reads.
+        try:
+            async with self.session.get(url, params=params, timeout=timeout + 10) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+        except aiohttp.ClientResponseError as err:
+            raise JBL4305PEventQueueError(f"Event queue rejected: {err}") from err
+        except aiohttp.ClientError as err:
+            self._record_failure(err)
+            raise JBL4305PConnectionError(f"Connection error: {err}") from err
+        except TimeoutError as err:
+            self._record_failure(err)
+            raise JBL4305PConnectionError("Request timeout") from err
+
+        if isinstance(data, dict) and "error" in data:
+            raise JBL4305PEventQueueError(data["error"].get("message", "Unknown error"))
+        return data if isinstance(data, list) else []
 
     async def get_device_name(self) -> str | None:
         """Get device name from NSDK settings, handling typed values."""
@@ -95,90 +590,77 @@ class JBL4305PClient:
         data = await self.nsdk_get_data("player:player/data")
         return data[0] if data else None
 
-    async def get_system_info(self) -> dict[str, Any]:
-        """Get system info from NSDK settings if available."""
+    async def get_system_info(self, keys: Iterable[str] | None = None) -> dict[str, Any]:
+        """Get system info from NSDK settings if available.
+
+        ``keys`` limits the fetch to a subset of ``SYSTEM_INFO_PATHS``.
+        """
+        keys = list(SYSTEM_INFO_PATHS if keys is None else keys)
+        # Settings are independent, so read them concurrently (bounded by _request_slot)
+        results = await asyncio.gather(
+            *(self.nsdk_get_data(SYSTEM_INFO_PATHS[key]) for key in keys),
+            return_exceptions=True,
+        )
         info: dict[str, Any] = {}
-        # Known settings
-        for path, key in [
-            ("settings:/system/primaryMacAddress", "mac"),
-            ("settings:/system/serialNumber", "serial"),
-            ("settings:/system/deviceUptime", "uptime"),
-            ("settings:/googlecast/castVersion", "cast_version"),
-        ]:
-            try:
-                val = await self.nsdk_get_data(path)
-                if val:
-                    v = val[0]
-                    if isinstance(v, dict) and "type" in v:
-                        info[key] = v.get(v.get("type"))
-                    else:
-                        info[key] = v
-            except Exception:  # best effort
-                pass
+        for key, val in zip(keys, results, strict=True):
+            if isinstance(val, BaseException):
+                # Best effort; failures are counted per path in ``metrics``
+                LOGGER.debug("Could not read %s: %s", SYSTEM_INFO_PATHS[key], val)
+                continue
+            if val:
+                info[key] = decode_typed_value(val[0])
         return info
 
     async def get_versions_and_network(self) -> dict[str, Any]:
-        """Parse index.fcgi for device version and network info as fallback."""
-        out: dict[str, Any] = {}
+        """Parse index.fcgi for device version and network info as fallback.
+
+        The page is streamed and reading stops once every field is found. The
+        connection is not reused after an early stop, which is fine for a page
+        fetched only at startup and after reboots.
+        """
         try:
-            async with self.session.get(f"{self.base_url}/index.fcgi", timeout=10) as resp:
-                text = await resp.text()
+            await self._async_check_circuit()
+            async with self._request_slot():
+                timeout = self._timeout()
+                with self.metrics.time(ENDPOINT_INDEX) as timer:
+                    async with self.session.get(
+                        f"{self.base_url}/index.fcgi", timeout=timeout
+                    ) as resp:
+                        try:
+                            return await self._index_reader.async_read(resp.content.iter_any())
+                        finally:
+                            timer.bytes = self._index_reader.last_read_bytes
         except Exception as err:  # noqa: BLE001
             LOGGER.debug("Failed to fetch index.fcgi: %s", err)
-            return out
-
-        # Regex extraction
-        m = re.search(r"Device version:\s*([^<\n]+)", text)
-        if m:
-            out["device_version"] = m.group(1).strip()
-        m = re.search(r"AirPlay version:\s*([^<\n]+)", text)
-        if m:
-            out["airplay_version"] = m.group(1).strip()
-        m = re.search(r"IP:\s*([\d\.]+/\d+)", text)
-        if m:
-            out["ip_cidr"] = m.group(1).strip()
-        m = re.search(r"Gateway:\s*([\d\.]+)", text)
-        if m:
-            out["gateway"] = m.group(1).strip()
-        m = re.search(r"DNS:\s*([^<\n]+)", text)
-        if m:
-            out["dns"] = ", ".join([d.strip() for d in m.group(1).split(",")])
-        return out
-
-    async def discover_bluetooth_devices(self) -> dict[str, dict[str, Any]]:
-        """Discover paired Bluetooth devices from player state and logs."""
-        devices = {}
+            return {}
+
+    async def discover_bluetooth_devices(
+        self, player_state: PlayerState = None
+    ) -> dict[str, dict[str, Any]]:
+        """Discover paired Bluetooth devices from player state.
 
-        # Get current player state to check for active Bluetooth device
-        player_state = await self.get_player_state()
-
-        if player_state and player_state.get("state") != "stopped":
-            media_roles = player_state.get("mediaRoles", {})
-            media_data = media_roles.get("mediaData", {})
-            meta_data = media_data.get("metaData", {})
-
-            # Check if current input is Bluetooth
-            if meta_data.get("serviceID") == "bluetooth":
-                # Extract device path from value
-                value = media_roles.get("value", {})
-                device_path = value.get("string_")
-                title = media_roles.get("title", "Unknown Device")
-
-                if device_path:
-                    # Extract MAC from path: /org/bluez/hci0/dev_XX_XX_XX_XX_XX_XX
-                    parts = device_path.split("/")
-                    if len(parts) >= 5 and parts[-1].startswith("dev_"):
-                        mac = parts[-1].replace("dev_", "").replace("_", ":").lower()
-                        devices[device_path] = {
-                            "name": title,
-                            "mac": mac,
-                            "path": device_path,
-                        }
+        Pass an existing ``player_state`` snapshot to avoid another round-trip.
+        """
+        if player_state is None:
+            player_state = await self.get_player_state()
+
+        devices = {}
+        snapshot = PlayerSnapshot.from_state(player_state)
+        if snapshot.state != "stopped":
+            device = snapshot.bluetooth_device
+            if device and device["mac"]:
+                devices[device["path"]] = device
 
         return devices
 
-    async def discover_available_inputs(self) -> dict[str, dict[str, Any]]:
-        """Discover all available inputs on the speaker."""
+    async def discover_available_inputs(
+        self, player_state: PlayerState = None, force: bool = False
+    ) -> dict[str, dict[str, Any]]:
+        """Discover all available inputs on the speaker.
+
+        Service presence comes from the per-speaker capability cache; pass
+        ``force`` to re-probe every service.
+        """
         inputs = {}
 
         # Add Google Cast (always available if speaker supports it)
@@ -188,10 +670,14 @@ class JBL4305PClient:
             "type": "googlecast",
         }
 
-        # Check for Bluetooth devices
-        bt_devices = await self.discover_bluetooth_devices()
+        # Bluetooth devices come from player state; probe services concurrently with it
+        bt_devices, services = await asyncio.gather(
+            self.discover_bluetooth_devices(player_state),
+            self._async_probe_services(force),
+        )
+
         for device_path, device_info in bt_devices.items():
-            input_id = f"bluetooth_{device_info['mac'].replace(':', '_').lower()}"
+            input_id = input_id_for("bluetooth", device_path)
             inputs[input_id] = {
                 "service_id": "bluetooth",
                 "name": f"Bluetooth - {device_info['name']}",
@@ -208,107 +694,52 @@ class JBL4305PClient:
                 "type": "bluetooth",
             }
 
-        # Check for other services by probing paths
-        # Note: These may return errors if not available, which is expected
-        other_services = {
-            "airplay": "AirPlay",
-            "spotify": "Spotify Connect",
-            "roon": "Roon",
-            "tidalConnect": "Tidal Connect",
-            "upnpRenderer": "UPnP/DLNA",
-        }
-
-        for service_id, service_name in other_services.items():
-            # Try to read service config to see if it exists
-            data = await self.nsdk_get_data(f"settings:/{service_id}")
-            if data:  # Service exists
-                inputs[service_id] = {
-                    "service_id": service_id,
-                    "name": service_name,
-                    "type": service_id,
-                }
+        for service_id in services:
+            inputs[service_id] = {
+                "service_id": service_id,
+                "name": INPUT_TYPES[service_id],
+                "type": service_id,
+            }
 
         return inputs
 
+    async def _async_probe_services(self, force: bool = False) -> list[str]:
+        """Return the probed services present on the speaker, using the capability cache.
+
+        Presence is cached for CAPABILITY_TTL and absence for
+        CAPABILITY_NEGATIVE_TTL; only expired or unknown services are probed, all
+        at once. Connection errors are raised and never cached.
+        """
+        now = time.monotonic()
+        to_probe = [
+            service_id
+            for service_id in PROBED_SERVICES
+            if force or (cached := self._capabilities.get(service_id)) is None or cached[0] <= now
+        ]
+
+        if to_probe:
+            # Reading a service's settings fails with an NSDK error if it does not exist
+            results = await asyncio.gather(
+                *(self.nsdk_get_data(f"settings:/{service_id}") for service_id in to_probe)
+            )
+            now = time.monotonic()
+            for service_id, data in zip(to_probe, results, strict=True):
+                ttl = CAPABILITY_TTL if data else CAPABILITY_NEGATIVE_TTL
+                self._capabilities[service_id] = (now + ttl, bool(data))
+
+        return [service_id for service_id in PROBED_SERVICES if self._capabilities[service_id][1]]
+
     async def switch_input(self, service_id: str, device_path: str | None = None) -> bool:
         """Switch to specified input."""
-        if service_id == "googlecast":
-            payload = {
-                "control": "play",
-                "mediaRoles": {
-                    "mediaData": {
-                        "metaData": {
-                            "live": True,
-                            "serviceID": "googlecast",
-                        }
-                    },
-                    "type": "audio",
-                    "audioType": "audioBroadcast",
-                    "title": "Chromecast built-in",
-                    "icon": "skin:iconGooglecast",
-                    "doNotTrack": True,
-                    "description": "Chromecast built-in",
-                },
-            }
-        elif service_id == "bluetooth":
-            payload = {
-                "control": "play",
-                "mediaRoles": {
-                    "type": "audio",
-                    "audioType": "audioBroadcast",
-                    "mediaData": {
-                        "metaData": {
-                            "serviceID": "bluetooth",
-                            "playLogicPath": "bluetooth:playlogic",
-                        }
-                    },
-                    "doNotTrack": True,
-                },
-            }
-
-            # Add device path if provided
-            if device_path:
-                payload["mediaRoles"]["value"] = {
-                    "string_": device_path,
-                    "type": "string_",
-                }
-        else:
-            # Generic service activation
-            payload = {
-                "control": "play",
-                "mediaRoles": {
-                    "type": "audio",
-                    "audioType": "audioBroadcast",
-                    "mediaData": {
-                        "metaData": {
-                            "serviceID": service_id,
-                        }
-                    },
-                },
-            }
-
-        return await self.nsdk_set_data("player:player/control", payload)
-
-    async def get_current_input(self) -> str | None:
-        """Get current active input service ID."""
-        player_state = await self.get_player_state()
-
-        if not player_state or player_state.get("state") == "stopped":
-            return None
-
-        media_roles = player_state.get("mediaRoles", {})
-        media_data = media_roles.get("mediaData", {})
-        meta_data = media_data.get("metaData", {})
-        service_id = meta_data.get("serviceID")
-
-        # For Bluetooth, include device path in ID
-        if service_id == "bluetooth":
-            value = media_roles.get("value", {})
-            device_path = value.get("string_")
-            if device_path:
-                parts = device_path.split("/")
-                if len(parts) >= 5 and parts[-1].startswith("dev_"):
-                    mac = parts[-1].replace("dev_", "").replace("_", ":").lower()
-                    return f"bluetooth_{mac.replace(':', '_')}"
-
-        return service_id
+        return await self.nsdk_set_data(
+            PATH_PLAYER_CONTROL, switch_input_payload(service_id, device_path)
+        )
+
+    async def get_current_input(self, player_state: PlayerState = None) -> str | None:
+        """Get current active input service ID.
+
+        Pass an existing ``player_state`` snapshot to avoid another round-trip.
+        """
+        if player_state is None:
+            player_state = await self.get_player_state()
+        return current_input_from_state(player_state)
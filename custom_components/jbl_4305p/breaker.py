@@ -0,0 +1,58 @@
+"""Circuit breaker for requests to one JBL 4305P speaker."""
+
+from __future__ import annotations
+
+import time
+
+from .const import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Track consecutive connection failures and decide whether requests may run.
+
+    - Closed: requests run; ``failure_threshold`` failures in a row open the circuit.
+    - Open: requests fail fast for ``reset_timeout`` seconds.
+    - Half-open: one trial request (the reachability probe) may run. Success
+      closes the circuit, failure opens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker in the closed state."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        # Times the circuit opened from closed, and requests refused while open
+        self.trips = 0
+        self.rejected = 0
+
+    def state(self, now: float | None = None) -> str:
+        """Return ``CIRCUIT_CLOSED``, ``CIRCUIT_OPEN`` or ``CIRCUIT_HALF_OPEN``."""
+        if self._opened_at is None:
+            return CIRCUIT_CLOSED
+        now = time.monotonic() if now is None else now
+        if now - self._opened_at >= self.reset_timeout:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+    def record_success(self) -> None:
+        """Close the circuit after any request that reached the speaker."""
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self, now: float | None = None) -> None:
+        """Count a connection failure, opening (or re-opening) the circuit if needed."""
+        self._failures += 1
+        if self._opened_at is None and self._failures < self.failure_threshold:
+            return
+        if self._opened_at is None:
+            self.trips += 1
+        self._opened_at = time.monotonic() if now is None else now
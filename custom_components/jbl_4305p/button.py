@@ -74,8 +74,10 @@ class SwitchToGoogleCastButton(ButtonEntity):
         }
 
     async def async_press(self) -> None:
-        client = self.hass.data[DOMAIN][self.entry.entry_id]["client"]
-        await client.switch_input("googlecast")
+        coordinator: JBL4305PDataUpdateCoordinator = self.hass.data[DOMAIN][self.entry.entry_id][
+            "coordinator"
+        ]
+        await coordinator.async_switch_input("googlecast")
 
 
 class SwitchToLastBluetoothButton(ButtonEntity):
@@ -97,12 +99,14 @@ class SwitchToLastBluetoothButton(ButtonEntity):
         }
 
     async def async_press(self) -> None:
-        client = self.hass.data[DOMAIN][self.entry.entry_id]["client"]
         coordinator: JBL4305PDataUpdateCoordinator = self.hass.data[DOMAIN][self.entry.entry_id][
             "coordinator"
         ]
         last_path = (coordinator.data or {}).get("last_bt_device_path")
-        await client.switch_input("bluetooth", device_path=last_path)
+        if not last_path and coordinator.inputs.bluetooth_device_paths:
+            # Nothing seen since startup: use the most recently added Bluetooth input
+            last_path = coordinator.inputs.bluetooth_device_paths[-1]
+        await coordinator.async_switch_input("bluetooth", device_path=last_path)
 
 
 class AddCurrentBluetoothButton(ButtonEntity):
@@ -0,0 +1,109 @@
+"""Command pipeline for JBL 4305P setData writes."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .api import JBL4305PClient
+from .const import COMMAND_DEBOUNCE, LOGGER
+
+
+class JBL4305PCommandQueue:
+    """Debounce, coalesce and serialize setData writes to one speaker.
+
+    Writes are held for ``debounce`` seconds after the last submission. A new
+    write to the same (path, role) replaces the pending one (last write wins);
+    callers of the superseded write get the result of the write that replaced
+    it. Remaining writes are sent one at a time in submission order, and
+    ``on_burst_done`` runs once after the whole burst has been sent.
+    """
+
+    def __init__(
+        self,
+        client: JBL4305PClient,
+        on_burst_done: Callable[[], Awaitable[None]] | None = None,
+        debounce: float = COMMAND_DEBOUNCE,
+    ) -> None:
+        """Initialize the queue."""
+        self._client = client
+        self._on_burst_done = on_burst_done
+        self._debounce = debounce
+        self._pending: dict[tuple[str, str], tuple[Any, list[asyncio.Future[bool]]]] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        # Flushes in progress (sending, or waiting on the burst callback)
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+        self.superseded = 0
+
+    async def async_set_data(self, path: str, value: Any, role: str = "activate") -> bool:
+        """Queue a write and wait until it (or the write superseding it) is sent."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[bool] = loop.create_future()
+        key = (path, role)
+
+        waiters = [future]
+        if key in self._pending:
+            # Re-queue at the end with the newest value; earlier callers share its result
+            _, superseded_waiters = self._pending.pop(key)
+            waiters = superseded_waiters + waiters
+            self.superseded += 1
+            LOGGER.debug("Coalesced superseded write to %s", path)
+        self._pending[key] = (value, waiters)
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(self._debounce, self._start_flush)
+
+        return await future
+
+    def _start_flush(self) -> None:
+        """Debounce expired: send what is pending."""
+        self._timer = None
+        task = asyncio.ensure_future(self._async_flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _async_flush(self) -> None:
+        """Send pending writes in order, then run the burst callback once."""
+        async with self._lock:
+            while self._pending:
+                key = next(iter(self._pending))
+                value, waiters = self._pending.pop(key)
+                path, role = key
+                try:
+                    result = await self._client.nsdk_set_data(path, value, role=role)
+                except asyncio.CancelledError:
+                    for waiter in waiters:
+                        waiter.cancel()
+                    raise
+                except Exception as err:  # noqa: BLE001
+                    LOGGER.error("Failed to send command to %s: %s", path, err)
+                    result = False
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
+
+        # More writes may have been queued meanwhile; the next flush reports the burst
+        if self._timer is None and not self._pending and self._on_burst_done is not None:
+            await self._on_burst_done()
+
+    async def async_cancel(self) -> None:
+        """Drop pending writes and stop any flush in progress, e.g. on unload.
+
+        The burst callback of a cancelled flush does not run.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, waiters in self._pending.values():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+        self._pending.clear()
+        for task in list(self._flush_tasks):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
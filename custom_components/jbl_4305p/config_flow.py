@@ -14,9 +14,17 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .api import JBL4305PClient, JBL4305PConnectionError
 from .const import (
     CONF_LOG_LEVEL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PUSH_UPDATES,
     CONF_SCAN_INTERVAL,
+    CONF_STALE_GRACE,
     DEFAULT_LOG_LEVEL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_PUSH_UPDATES,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_GRACE,
     DOMAIN,
     LOGGER,
 )
@@ -134,12 +142,17 @@ class JBL4305POptionsFlow(config_entries.OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            # Rediscover inputs if requested
-            if user_input.get("rediscover_inputs", False):
+            # Rediscover inputs if requested; the flag is an action, not an option to store
+            if user_input.pop("rediscover_inputs", False):
                 try:
-                    session = async_get_clientsession(self.hass)
-                    client = JBL4305PClient(self.config_entry.data[CONF_HOST], session)
-                    inputs = await client.discover_available_inputs()
+                    # Reuse the loaded entry's client so its capability cache is refreshed
+                    entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+                    if entry_data:
+                        client = entry_data["client"]
+                    else:
+                        session = async_get_clientsession(self.hass)
+                        client = JBL4305PClient(self.config_entry.data[CONF_HOST], session)
+                    inputs = await client.discover_available_inputs(force=True)
                     user_input["available_inputs"] = inputs
                 except JBL4305PConnectionError:
                     errors["base"] = "cannot_connect"
@@ -165,10 +178,34 @@ class JBL4305POptionsFlow(config_entries.OptionsFlow):
                             CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
                         ),
                     ): vol.All(vol.Coerce(int), vol.Range(min=10, max=300)),
+                    vol.Optional(
+                        CONF_MIN_SCAN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                    vol.Optional(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                    vol.Optional(
+                        CONF_STALE_GRACE,
+                        default=self.config_entry.options.get(
+                            CONF_STALE_GRACE, DEFAULT_STALE_GRACE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
                     vol.Optional(
                         CONF_LOG_LEVEL,
                         default=self.config_entry.options.get(CONF_LOG_LEVEL, DEFAULT_LOG_LEVEL),
                     ): vol.In(LOG_LEVELS),
+                    vol.Optional(
+                        CONF_PUSH_UPDATES,
+                        default=self.config_entry.options.get(
+                            CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES
+                        ),
+                    ): bool,
                     vol.Optional("rediscover_inputs", default=False): bool,
                 }
             ),
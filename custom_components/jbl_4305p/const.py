@@ -5,16 +5,123 @@ from logging import Logger, getLogger
 LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = "jbl_4305p"
+# hass.data key of the scheduler shared by every speaker entry
+DATA_FLEET = f"{DOMAIN}_fleet"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
 CONF_LOG_LEVEL = "log_level"
+CONF_PUSH_UPDATES = "push_updates"
+CONF_STALE_GRACE = "stale_grace"
 DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 300
 DEFAULT_LOG_LEVEL = "info"
+DEFAULT_PUSH_UPDATES = True
+# Seconds the last good data is still served while the speaker is unreachable
+DEFAULT_STALE_GRACE = 120
+
+# Options applied to the running entry without a reload; anything else reloads it
+LIVE_OPTIONS = frozenset(
+    {
+        "available_inputs",
+        CONF_SCAN_INTERVAL,
+        CONF_MIN_SCAN_INTERVAL,
+        CONF_MAX_SCAN_INTERVAL,
+        CONF_LOG_LEVEL,
+        CONF_STALE_GRACE,
+        # Options flow action flag, only present in options saved by older versions
+        "rediscover_inputs",
+    }
+)
+
+# Upper bound on simultaneous HTTP requests to a single speaker. The embedded
+# fcgi server handles a handful of parallel requests but stalls beyond that.
+MAX_CONCURRENT_REQUESTS = 4
+# Upper bound on simultaneous HTTP requests across all speakers (the event
+# queue long-polls are not counted), so many speakers polling at once do not
+# flood the event loop and the Wi-Fi.
+FLEET_MAX_CONCURRENT_REQUESTS = 8
+
+# Input discovery caches which services a speaker has: present services are
+# re-probed after CAPABILITY_TTL seconds, absent ones after CAPABILITY_NEGATIVE_TTL.
+CAPABILITY_TTL = 86400
+CAPABILITY_NEGATIVE_TTL = 21600
+
+# Persistent per-speaker cache of device facts and discovered inputs
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+# Dedicated HTTP transport per speaker: one connection per request slot plus one
+# for the event queue long-poll, DNS cached for DNS_CACHE_TTL seconds, idle
+# connections kept for KEEPALIVE_TIMEOUT seconds and refreshed by a cheap read
+# when the speaker has been quiet for KEEP_WARM_INTERVAL seconds.
+MAX_CONNECTIONS = MAX_CONCURRENT_REQUESTS + 1
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+KEEP_WARM_INTERVAL = 45
+
+# Identical concurrent getData reads share one request; the result is then
+# reused for READ_CACHE_TTL seconds to absorb near-simultaneous callers.
+READ_CACHE_TTL = 0.5
+
+# Requests time out after REQUEST_TIMEOUT seconds. BREAKER_FAILURE_THRESHOLD
+# connection failures in a row open the per-speaker circuit: requests then fail
+# fast for BREAKER_RESET_TIMEOUT seconds, after which one read with a
+# PROBE_TIMEOUT second timeout decides whether the speaker is back.
+REQUEST_TIMEOUT = 10
+PROBE_TIMEOUT = 2
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_RESET_TIMEOUT = 30
+
+# Total time one coordinator refresh may spend on requests; each request gets
+# what is left. The player coordinator caps it at UPDATE_BUDGET_SHARE of its
+# minimum scan interval, so a refresh never outlasts that interval.
+UPDATE_BUDGET = 8
+UPDATE_BUDGET_SHARE = 0.8
+
+# Refresh tiers, each with its own coordinator: player state is polled every
+# scan interval, system facts (MAC, serial, cast version, uptime) hourly or on
+# reconnect, and the index.fcgi versions/network scrape at startup and after a
+# reboot. A failed diagnostics refresh is retried after DIAGNOSTICS_RETRY_INTERVAL.
+SYSTEM_REFRESH_INTERVAL = 3600
+DIAGNOSTICS_RETRY_INTERVAL = 300
+
+# Uptime is turned into a boot timestamp; a re-read that moves it by less than
+# BOOT_TIME_DRIFT seconds keeps the old value, a later boot time means a reboot.
+BOOT_TIME_DRIFT = 30
+
+# NSDK event queue (push updates). The long-poll is held open for
+# EVENT_POLL_TIMEOUT seconds; while it is healthy, timed polling only runs as
+# a heartbeat every EVENT_HEARTBEAT_INTERVAL seconds. A lost queue is
+# resubscribed at once; further losses in a row wait EVENT_RETRY_DELAY seconds,
+# doubling each time, and after EVENT_MAX_QUEUE_LOSSES the speaker stays on
+# timed polling.
+EVENT_POLL_TIMEOUT = 25
+EVENT_HEARTBEAT_INTERVAL = 300
+EVENT_RETRY_DELAY = 10
+EVENT_MAX_QUEUE_LOSSES = 5
+
+# Adaptive polling: poll at the minimum interval for COMMAND_BOOST_WINDOW seconds
+# after a command, double the interval for every IDLE_STRETCH_AFTER seconds the
+# player stays stopped, and randomise unreachable backoff by +/- BACKOFF_JITTER.
+COMMAND_BOOST_WINDOW = 60
+IDLE_STRETCH_AFTER = 600
+BACKOFF_JITTER = 0.2
+
+# Commands are held this many seconds so rapid clicks collapse into one write
+COMMAND_DEBOUNCE = 0.3
+# After a burst of commands, one player:player/data read this many seconds later
+# confirms (or rolls back) the optimistically applied input
+COMMAND_CONFIRM_DELAY = 1.5
 
 # NSDK API paths
 PATH_PLAYER_CONTROL = "player:player/control"
 PATH_PLAYER_DATA = "player:player/data"
 PATH_DEVICE_NAME = "settings:/deviceName"
 PATH_BLUETOOTH_SETTINGS = "settings:/bluetooth"
+PATH_EVENT_MODIFY_QUEUE = "/api/event/modifyQueue"
+PATH_EVENT_POLL_QUEUE = "/api/event/pollQueue"
 
 # Known service IDs
 SERVICE_GOOGLECAST = "googlecast"
@@ -1,69 +1,599 @@
-"""DataUpdateCoordinator for JBL 4305P."""
+"""DataUpdateCoordinators for JBL 4305P."""
 
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import JBL4305PClient, JBL4305PConnectionError
-from .const import LOGGER
+from .api import (
+    SYSTEM_INFO_PATHS,
+    JBL4305PApiError,
+    JBL4305PClient,
+    JBL4305PConnectionError,
+    JBL4305PEventQueueError,
+    PlayerSnapshot,
+    decode_typed_value,
+    input_id_for,
+    request_deadline,
+    switch_input_payload,
+)
+from .commands import JBL4305PCommandQueue
+from .const import (
+    BOOT_TIME_DRIFT,
+    COMMAND_CONFIRM_DELAY,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_STALE_GRACE,
+    DIAGNOSTICS_RETRY_INTERVAL,
+    EVENT_HEARTBEAT_INTERVAL,
+    EVENT_MAX_QUEUE_LOSSES,
+    EVENT_RETRY_DELAY,
+    LOGGER,
+    PATH_PLAYER_CONTROL,
+    PATH_PLAYER_DATA,
+    SYSTEM_REFRESH_INTERVAL,
+    UPDATE_BUDGET,
+    UPDATE_BUDGET_SHARE,
+)
+from .inputs import JBL4305PInputRegistry
+from .scheduler import AdaptivePollScheduler, FleetScheduler
+from .storage import JBL4305PDeviceCache
 
+# A coordinator data field: (key,) or, inside dict values, (key, subkey)
+Field = tuple[str, ...]
 
-class JBL4305PDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Class to manage fetching JBL 4305P data."""
+# Settings pushed through the event queue: only those that change at runtime. MAC,
+# serial and cast version are fixed, and uptime changes constantly (it is tracked
+# as a boot timestamp instead)
+EVENT_SYSTEM_PATHS = {SYSTEM_INFO_PATHS["device_name"]: "device_name"}
+EVENT_SUBSCRIPTIONS = [PATH_PLAYER_DATA, *EVENT_SYSTEM_PATHS]
+
+
+class JBL4305PCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Base coordinator that tracks which data fields changed between notifications.
+
+    Each refresh runs under a total ``update_budget`` (``UPDATE_BUDGET``, or
+    less for a short minimum scan interval): every request gets the time left
+    of it, so a partial result is returned rather than one slow read holding
+    up the cycle. ``field_updated`` records when each top-level field
+    last came from the speaker. A refresh requested while one is running is
+    skipped and counted in ``skipped_refreshes``.
+
+    When a refresh fails, the last good data keeps being served (``stale``)
+    until it is ``stale_grace`` seconds old; only then does the refresh fail
+    and entities become unavailable.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize."""
+        # Change detection: fields that differ from the data listeners saw last
+        self.changed_fields: set[Field] | None = None
+        self._notified_data: dict[str, Any] | None = None
+        self.write_stats = {"written": 0, "skipped": 0}
+        self.field_updated: dict[str, datetime] = {}
+        # Stale-while-revalidate: when data last came from the speaker
+        self.data_updated: datetime | None = None
+        self.stale_grace: float = DEFAULT_STALE_GRACE
+        self.stale = False
+        self.update_budget: float = UPDATE_BUDGET
+        self._refreshing = False
+        self.skipped_refreshes = 0
+        super().__init__(*args, **kwargs)
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh within the update budget, unless a refresh is already running."""
+        if self._refreshing:
+            # The running refresh reschedules the next one when it finishes
+            self.skipped_refreshes += 1
+            LOGGER.debug("%s refresh still running, skipping another", self.name)
+            return
+        self._refreshing = True
+        try:
+            with request_deadline(self.update_budget):
+                await super()._async_refresh(*args, **kwargs)
+        finally:
+            self._refreshing = False
+
+    @property
+    def data_age(self) -> float | None:
+        """Return how many seconds ago data last came from the speaker."""
+        if self.data_updated is None:
+            return None
+        return (dt_util.utcnow() - self.data_updated).total_seconds()
+
+    def _mark_fresh(self, keys: Iterable[str]) -> None:
+        """Record that the values of ``keys`` were just read from the speaker."""
+        now = dt_util.utcnow()
+        for key in keys:
+            self.field_updated[key] = now
+        self.data_updated = now
+        self._set_stale(False)
+
+    def _serve_stale(self, message: str, err: Exception | None = None) -> dict[str, Any]:
+        """Return the last good data within ``stale_grace``, else raise ``UpdateFailed``."""
+        age = self.data_age
+        if self.data is None or age is None or age > self.stale_grace:
+            raise UpdateFailed(message) from err
+        if not self.stale:
+            LOGGER.debug("%s: %s; serving data from %.0fs ago", self.name, message, age)
+        self._set_stale(True)
+        return self.data
+
+    def _set_stale(self, stale: bool) -> None:
+        if stale != self.stale:
+            self.stale = stale
+            # Entities show the staleness in their attributes
+            self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Record which fields changed since the last notification, then notify."""
+        self.changed_fields = _changed_fields(self._notified_data, self.data)
+        self._notified_data = self.data
+        super().async_update_listeners()
+
+
+class JBL4305PSystemCoordinator(JBL4305PCoordinator):
+    """Speaker name, MAC, serial, cast version and boot time from NSDK settings, refreshed hourly.
+
+    Also refreshed when the player coordinator reconnects or the event queue
+    is lost. ``on_reboot`` runs when the boot time moves forward.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: JBL4305PClient,
+        cache: JBL4305PDeviceCache | None = None,
+        on_reboot: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        """Initialize."""
+        self.client = client
+        self.cache = cache
+        self._on_reboot = on_reboot
+        super().__init__(
+            hass,
+            LOGGER,
+            name="JBL 4305P system",
+            update_interval=timedelta(seconds=SYSTEM_REFRESH_INTERVAL),
+        )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch system settings and re-sync the boot time."""
+        system_info = await self.client.get_system_info()
+        if not system_info:
+            self.update_interval = timedelta(seconds=DIAGNOSTICS_RETRY_INTERVAL)
+            return self._serve_stale("No system settings could be read")
+        self.update_interval = timedelta(seconds=SYSTEM_REFRESH_INTERVAL)
+        if missing := SYSTEM_INFO_PATHS.keys() - system_info.keys():
+            # Partial read (e.g. out of budget): keep the previous values of the rest
+            LOGGER.debug("System settings not refreshed this time: %s", sorted(missing))
+
+        data = dict(self.data or {})
+        uptime = system_info.pop("uptime", None)
+        data.update(system_info)
+        self._mark_fresh(system_info)
+        if uptime is not None:
+            self._mark_fresh(("boot_time",))
+        if self._sync_boot_time(data, uptime):
+            LOGGER.debug("Speaker reboot detected, refreshing versions")
+            if self._on_reboot is not None:
+                self.hass.async_create_task(self._on_reboot())
+
+        if self.cache is not None:
+            # The boot time is re-synced on every start instead
+            self.cache.async_update(
+                system={key: value for key, value in data.items() if key != "boot_time"}
+            )
+        return data
+
+    @callback
+    def async_restore(self, cached: dict[str, Any]) -> None:
+        """Serve cached settings until the first refresh confirms them."""
+        if cached:
+            self.data = dict(cached)
+
+    @callback
+    def async_set_values(self, values: dict[str, Any]) -> None:
+        """Merge pushed setting values and notify listeners."""
+        self._mark_fresh(values)
+        self.async_set_updated_data({**(self.data or {}), **values})
+
+    def _sync_boot_time(self, data: dict[str, Any], uptime: Any) -> bool:
+        """Update ``data["boot_time"]`` from an uptime reading; return True on a reboot.
+
+        Uptime is extrapolated locally from the boot timestamp, so the value
+        (and entity state) only changes when the reading drifts by more than
+        ``BOOT_TIME_DRIFT``. A boot time later than the known one means uptime
+        went backwards, i.e. the speaker rebooted.
+        """
+        try:
+            boot_time = dt_util.utcnow() - timedelta(seconds=float(uptime))
+        except (TypeError, ValueError):
+            return False
+        previous = data.get("boot_time")
+        if previous is not None and abs((boot_time - previous).total_seconds()) <= BOOT_TIME_DRIFT:
+            return False
+        data["boot_time"] = boot_time.replace(microsecond=0)
+        return previous is not None and boot_time > previous
+
+
+class JBL4305PVersionsCoordinator(JBL4305PCoordinator):
+    """Versions and network info scraped from index.fcgi.
+
+    Not polled: refreshed at startup and after a reboot. A failed scrape
+    marks only these sensors unavailable and is retried every
+    ``DIAGNOSTICS_RETRY_INTERVAL`` seconds until it succeeds.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: JBL4305PClient,
+        cache: JBL4305PDeviceCache | None = None,
+    ) -> None:
+        """Initialize."""
+        self.client = client
+        self.cache = cache
+        super().__init__(hass, LOGGER, name="JBL 4305P versions", update_interval=None)
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Scrape versions and network info."""
+        versions = await self.client.get_versions_and_network()
+        if not versions:
+            self.update_interval = timedelta(seconds=DIAGNOSTICS_RETRY_INTERVAL)
+            return self._serve_stale("No version information found in index.fcgi")
+        self.update_interval = None
+        self._mark_fresh(versions)
+
+        if self.cache is not None:
+            self.cache.async_update(versions=versions)
+        return versions
+
+    @callback
+    def async_restore(self, cached: dict[str, Any]) -> None:
+        """Serve cached versions until the first refresh confirms them."""
+        if cached:
+            self.data = dict(cached)
+
+
+class JBL4305PDataUpdateCoordinator(JBL4305PCoordinator):
+    """Player state and current input, polled at the adaptive scan interval.
+
+    Owns the slow ``system`` and ``versions`` coordinators, which poll and
+    fail independently so diagnostics never affect the input select. Timed
+    polls run at this speaker's phase in the ``fleet``, if given.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
         client: JBL4305PClient,
         update_interval: int,
+        min_interval: int = DEFAULT_MIN_SCAN_INTERVAL,
+        max_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        cache: JBL4305PDeviceCache | None = None,
+        stale_grace: float = DEFAULT_STALE_GRACE,
+        fleet: FleetScheduler | None = None,
     ) -> None:
         """Initialize."""
         self.client = client
+        self.fleet = fleet
+        # Loop time the next timed poll is due at, when scheduled by the fleet
+        self._poll_due: float | None = None
+        # Event-loop time of the current refresh's synchronous steps
+        self._cycle_loop_time = 0.0
+        self.cache = cache
+        self.versions = JBL4305PVersionsCoordinator(hass, client, cache)
+        self.system = JBL4305PSystemCoordinator(
+            hass, client, cache, on_reboot=self.versions.async_request_refresh
+        )
+        # Selectable inputs, shared by entities and services
+        self.inputs = JBL4305PInputRegistry()
         self._last_bt_device_path: str | None = None
+        self.scheduler = AdaptivePollScheduler(update_interval, min_interval, max_interval)
+        self._next_interval = self.scheduler.base_interval
+        # Push updates via the NSDK event queue
+        self.push_active = False
+        # setData pipeline; one confirming read follows each burst of commands
+        self.commands = JBL4305PCommandQueue(client, self._async_confirm_commands)
+        # Last data that came from the speaker, for rolling back optimistic updates
+        self._confirmed_data: dict[str, Any] | None = None
+        self.startup_timings: dict[str, float] = {}
         super().__init__(
             hass,
             LOGGER,
             name="JBL 4305P",
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=timedelta(seconds=self._next_interval),
         )
+        self._apply_budget()
+        self.async_set_stale_grace(stale_grace)
+
+    async def async_startup_refresh(self) -> None:
+        """Run the first refresh; only reachability and player state are on the critical path.
+
+        Raises ``ConfigEntryNotReady`` like ``async_config_entry_first_refresh``.
+        Call ``async_complete_startup`` afterwards to load the diagnostics.
+        """
+        started = time.monotonic()
+        await self.async_config_entry_first_refresh()
+        self.startup_timings["critical_path"] = time.monotonic() - started
+
+    async def async_complete_startup(self, started: float) -> None:
+        """Load (or confirm cached) system facts and versions in the background.
+
+        ``started`` is the ``time.monotonic()`` value when entry setup began.
+        """
+        await asyncio.gather(self.system.async_refresh(), self.versions.async_refresh())
+        self.startup_timings["complete"] = time.monotonic() - started
+        LOGGER.debug(
+            "%s startup: critical path %.3fs, complete %.3fs",
+            self.name,
+            self.startup_timings.get("critical_path", 0.0),
+            self.startup_timings["complete"],
+        )
+
+    @callback
+    def async_restore(self, cached: dict[str, Any]) -> None:
+        """Seed the diagnostics coordinators from the persistent cache."""
+        self.system.async_restore(cached.get("system", {}))
+        self.versions.async_restore(cached.get("versions", {}))
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Update data via library."""
         try:
             player_state = await self.client.get_player_state()
-            current_input = await self.client.get_current_input()
-            system_info = await self.client.get_system_info()
-
-            # Try to get versions/network but don't fail setup if it errors
-            versions_net = {}
-            try:
-                versions_net = await self.client.get_versions_and_network()
-            except Exception as err:
-                LOGGER.debug("Failed to fetch versions/network info: %s", err)
-
-            # Track last seen Bluetooth device path
-            if player_state:
-                media_roles = player_state.get("mediaRoles", {})
-                media_data = media_roles.get("mediaData", {})
-                meta = media_data.get("metaData", {})
-                if meta.get("serviceID") == "bluetooth":
-                    val = media_roles.get("value", {})
-                    path = val.get("string_")
-                    if path:
-                        self._last_bt_device_path = path
-
-            return {
-                "player_state": player_state or {},
-                "current_input": current_input,
-                "state": player_state.get("state") if player_state else "unknown",
-                "system": system_info,
-                "versions": versions_net,
-                "last_bt_device_path": self._last_bt_device_path,
-            }
         except JBL4305PConnectionError as err:
-            # Mark update failed but do not crash; this will make entities unavailable until next success
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+            self._apply_interval(self.scheduler.next_interval(None, reachable=False))
+            # Entities keep the last data for the grace window, then go unavailable
+            return self._serve_stale(f"Error communicating with API: {err}", err)
+
+        if not self.last_update_success or self.stale:
+            # Reconnected: the speaker may have rebooted meanwhile
+            self._async_resync_system()
+        data = self._build_data(player_state)
+        self._apply_interval(self.scheduler.next_interval(data["state"], reachable=True))
+        return data
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh, and report the cycle to the fleet.
+
+        A cycle's loop time is the time its own synchronous steps held the
+        event loop: building data from the response and notifying listeners.
+        """
+        if self.fleet is None or self._refreshing:
+            await super()._async_refresh(*args, **kwargs)
+            return
+
+        loop = self.hass.loop
+        due, started = self._poll_due, loop.time()
+        self._cycle_loop_time = 0.0
+        await super()._async_refresh(*args, **kwargs)
+        duration = loop.time() - started
+        # Only timed polls have a due time; HA rounds timer starts to within a second
+        lag = started - due if kwargs.get("scheduled") and due is not None else None
+        self.fleet.record_cycle(self, lag, duration, self._cycle_loop_time)
+        LOGGER.debug(
+            "%s %s poll: took %.1fms, %.2fms of event-loop time",
+            self.name,
+            self.client.host,
+            duration * 1000,
+            self._cycle_loop_time * 1000,
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners, counting the time towards the current cycle."""
+        started = time.perf_counter()
+        super().async_update_listeners()
+        self._cycle_loop_time += time.perf_counter() - started
+
+    @callback
+    def _async_resync_system(self) -> None:
+        """Refresh system settings (and so the boot time) outside the hourly schedule."""
+        self.hass.async_create_task(self.system.async_request_refresh())
+
+    def _apply_interval(self, seconds: float) -> None:
+        """Set the interval until the next timed poll.
+
+        With a fleet, the interval is stretched or shortened (by up to half)
+        so the poll lands on this speaker's phase.
+        """
+        self._next_interval = seconds
+        if self.push_active:
+            # Event queue delivers changes; timed polls are only a heartbeat
+            seconds = max(seconds, EVENT_HEARTBEAT_INTERVAL)
+        if self.fleet is not None:
+            now = self.hass.loop.time()
+            self._poll_due = self.fleet.next_poll(self, seconds, now)
+            seconds = self._poll_due - now
+        self.update_interval = timedelta(seconds=seconds)
+
+    def async_set_intervals(self, base: int, minimum: int, maximum: int) -> None:
+        """Apply new scan interval options to the running coordinator."""
+        self.scheduler.set_intervals(base, minimum, maximum)
+        self._apply_budget()
+        self._apply_interval(self.scheduler.base_interval)
+
+    def _apply_budget(self) -> None:
+        """Keep a refresh shorter than the minimum scan interval."""
+        self.update_budget = min(UPDATE_BUDGET, self.scheduler.min_interval * UPDATE_BUDGET_SHARE)
+
+    def async_set_stale_grace(self, seconds: float) -> None:
+        """Set how long all three coordinators serve their last data while unreachable."""
+        for coordinator in (self, self.system, self.versions):
+            coordinator.stale_grace = seconds
+
+    def async_note_command(self) -> None:
+        """Record a user command so the next polls run at the minimum interval.
+
+        Applied right away, so a stretched idle interval does not delay the
+        first of them; the optimistic update reschedules with it.
+        """
+        self.scheduler.note_command()
+        self._apply_interval(self.scheduler.min_interval)
+
+    async def async_switch_input(self, service_id: str, device_path: str | None = None) -> bool:
+        """Switch input through the command queue.
+
+        The expected input is shown immediately; a targeted read after the
+        burst confirms it or rolls it back.
+        """
+        self.async_note_command()
+        if self.data is not None:
+            self.async_set_updated_data(
+                {**self.data, "current_input": input_id_for(service_id, device_path)}
+            )
+
+        success = await self.commands.async_set_data(
+            PATH_PLAYER_CONTROL, switch_input_payload(service_id, device_path)
+        )
+        if not success and self._confirmed_data is not None:
+            LOGGER.debug("Input switch failed, rolling back to %s", self._confirmed_data)
+            self.async_set_updated_data(self._confirmed_data)
+        return success
+
+    async def _async_confirm_commands(self) -> None:
+        """Re-read player state once after a command burst and correct the optimistic input."""
+        await asyncio.sleep(COMMAND_CONFIRM_DELAY)
+        try:
+            player_state = await self.client.get_player_state()
+        except JBL4305PConnectionError as err:
+            LOGGER.debug("Could not confirm input switch, next poll will: %s", err)
+            return
+
+        expected = (self.data or {}).get("current_input")
+        data = self._build_data(player_state)
+        if data["current_input"] != expected:
+            LOGGER.debug(
+                "Speaker reports input %s, not %s; rolling back", data["current_input"], expected
+            )
+        self.async_set_updated_data(data)
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending commands and stop refreshing."""
+        await self.commands.async_cancel()
+        await asyncio.gather(self.system.async_shutdown(), self.versions.async_shutdown())
+        await super().async_shutdown()
+
+    def _build_data(self, player_state: dict[str, Any] | None) -> dict[str, Any]:
+        """Assemble coordinator data from a raw player state response."""
+        started = time.perf_counter()
+        player = PlayerSnapshot.from_state(player_state)
+        # Track last seen Bluetooth device path
+        if bt_device := player.bluetooth_device:
+            self._last_bt_device_path = bt_device["path"]
+
+        self._confirmed_data = {
+            "player": player,
+            "current_input": player.current_input,
+            "state": player.state if player_state else "unknown",
+            "last_bt_device_path": self._last_bt_device_path,
+        }
+        self._cycle_loop_time += time.perf_counter() - started
+        self._mark_fresh(self._confirmed_data)
+        return self._confirmed_data
+
+    def async_start_push(self, entry: ConfigEntry) -> None:
+        """Listen to the speaker's event queue for the lifetime of ``entry``."""
+        entry.async_create_background_task(
+            self.hass, self._async_event_loop(), f"{self.name} event queue"
+        )
+
+    def _set_push_active(self, active: bool) -> None:
+        """Switch timed polling between adaptive cadence and slow heartbeat."""
+        self.push_active = active
+        self._apply_interval(self._next_interval)
+
+    async def _async_event_loop(self) -> None:
+        """Long-poll the NSDK event queue and push changes to listeners."""
+        queue_id: str | None = None
+        # Queues lost in a row without a successful poll in between
+        losses = 0
+        try:
+            while True:
+                try:
+                    if queue_id is None:
+                        queue_id = await self.client.event_subscribe(EVENT_SUBSCRIPTIONS)
+                        LOGGER.debug("Subscribed to event queue %s", queue_id)
+                        self._set_push_active(True)
+                    self._apply_events(await self.client.event_poll(queue_id))
+                    losses = 0
+                except JBL4305PEventQueueError as err:
+                    if queue_id is None:
+                        # Subscription itself was refused: stay on timed polling
+                        LOGGER.info("Push updates unavailable, using polling: %s", err)
+                        return
+                    queue_id = None
+                    losses += 1
+                    if losses > EVENT_MAX_QUEUE_LOSSES:
+                        LOGGER.info("Event queue keeps failing, using polling: %s", err)
+                        return
+                    if losses == 1:
+                        LOGGER.debug("Event queue lost, resubscribing: %s", err)
+                        # Queues are dropped when the speaker reboots
+                        self._async_resync_system()
+                        continue
+                    # A queue that fails right after subscribing: back off instead of spinning
+                    delay = EVENT_RETRY_DELAY * 2 ** (losses - 2)
+                    LOGGER.debug("Event queue lost again, resubscribing in %ss: %s", delay, err)
+                    self._set_push_active(False)
+                    await asyncio.sleep(delay)
+                except JBL4305PApiError as err:
+                    LOGGER.debug("Event queue unreachable, polling until it recovers: %s", err)
+                    queue_id = None
+                    self._set_push_active(False)
+                    await asyncio.sleep(EVENT_RETRY_DELAY)
+        finally:
+            self._set_push_active(False)
+
+    def _apply_events(self, events: list[dict[str, Any]]) -> None:
+        """Merge queued events into coordinator data and notify listeners."""
+        if not events or self.data is None:
+            return
+
+        player_state: dict[str, Any] | None = None
+        system_values: dict[str, Any] = {}
+        for event in events:
+            if "itemValue" not in event:
+                continue
+            path = event.get("path")
+            if path == PATH_PLAYER_DATA:
+                # Only the newest player state in a batch matters
+                player_state = event["itemValue"]
+            elif path in EVENT_SYSTEM_PATHS:
+                system_values[EVENT_SYSTEM_PATHS[path]] = decode_typed_value(event["itemValue"])
+
+        if player_state is not None:
+            self.async_set_updated_data(self._build_data(player_state))
+        if system_values:
+            self.system.async_set_values(system_values)
+
+
+def _changed_fields(old: dict[str, Any] | None, new: dict[str, Any] | None) -> set[Field] | None:
+    """Return the fields that differ between two data snapshots, or None if either is missing."""
+    if old is None or new is None:
+        return None
+    changed: set[Field] = set()
+    for key in old.keys() | new.keys():
+        old_value, new_value = old.get(key), new.get(key)
+        if old_value == new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changed.add((key,))
+            changed.update(
+                (key, sub)
+                for sub in old_value.keys() | new_value.keys()
+                if old_value.get(sub) != new_value.get(sub)
+            )
+        else:
+            changed.add((key,))
+    return changed
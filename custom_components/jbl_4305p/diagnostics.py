@@ -0,0 +1,72 @@
+"""Diagnostics support for JBL 4305P."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import JBL4305PCoordinator, JBL4305PDataUpdateCoordinator
+
+TO_REDACT = {CONF_HOST, "mac", "serial", "ip_cidr", "gateway", "dns", "device_path"}
+
+
+def _coordinator_diagnostics(coordinator: JBL4305PCoordinator) -> dict[str, Any]:
+    """Return the refresh state of one coordinator."""
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": (
+            coordinator.update_interval.total_seconds() if coordinator.update_interval else None
+        ),
+        "stale": coordinator.stale,
+        "data_age": coordinator.data_age,
+        "field_updated": {
+            key: value.isoformat() for key, value in coordinator.field_updated.items()
+        },
+        "skipped_refreshes": coordinator.skipped_refreshes,
+        "write_stats": dict(coordinator.write_stats),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator: JBL4305PDataUpdateCoordinator = entry_data["coordinator"]
+    client = entry_data["client"]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(
+                {key: value for key, value in entry.options.items() if key != "available_inputs"},
+                TO_REDACT,
+            ),
+            "inputs": len(coordinator.inputs),
+        },
+        "coordinators": {
+            "player": {
+                **_coordinator_diagnostics(coordinator),
+                "push_active": coordinator.push_active,
+                "startup_timings": dict(coordinator.startup_timings),
+            },
+            "system": _coordinator_diagnostics(coordinator.system),
+            "versions": _coordinator_diagnostics(coordinator.versions),
+        },
+        "client": {
+            "circuit": {
+                "state": client.breaker.state(),
+                "trips": client.breaker.trips,
+                "rejected": client.breaker.rejected,
+            },
+            "read_cache": client.read_stats,
+            "requests": client.metrics.as_dict(),
+        },
+        "transport": entry_data["transport"].stats,
+        "fleet": coordinator.fleet.as_dict(coordinator) if coordinator.fleet else None,
+    }
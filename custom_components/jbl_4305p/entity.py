@@ -0,0 +1,49 @@
+"""Base entity for JBL 4305P coordinator entities."""
+
+from __future__ import annotations
+
+from typing import Any, TypeVar
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import Field, JBL4305PCoordinator
+
+_CoordinatorT = TypeVar("_CoordinatorT", bound=JBL4305PCoordinator)
+
+
+class JBL4305PCoordinatorEntity(CoordinatorEntity[_CoordinatorT]):
+    """Coordinator entity that only writes state when a field it shows has changed.
+
+    Subclasses list the coordinator fields they render in ``_fields``; see
+    ``JBL4305PCoordinator.changed_fields`` for the field format. While the
+    coordinator serves stale data, ``data_as_of`` says when it was last read.
+    """
+
+    _fields: frozenset[Field] = frozenset()
+    _written_available: bool | None = None
+    _written_stale = False
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return when the shown data was read, while it is stale."""
+        if not self.coordinator.stale:
+            return None
+        return {"data_as_of": self.coordinator.data_updated}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state unless neither availability, staleness nor any of ``_fields`` changed."""
+        changed = self.coordinator.changed_fields
+        if (
+            changed is not None
+            and self.available == self._written_available
+            and self.coordinator.stale == self._written_stale
+            and changed.isdisjoint(self._fields)
+        ):
+            self.coordinator.write_stats["skipped"] += 1
+            return
+        self._written_available = self.available
+        self._written_stale = self.coordinator.stale
+        self.coordinator.write_stats["written"] += 1
+        super()._handle_coordinator_update()
@@ -0,0 +1,130 @@
+"""Streaming parser for the JBL 4305P index.fcgi status page."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import AsyncIterable
+
+INDEX_FIELDS = ("device_version", "airplay_version", "ip_cidr", "gateway", "dns")
+
+# One pattern per field: each starts with a literal, which the regex engine
+# finds far faster than it can try an alternation at every byte. Values never
+# span lines.
+_INDEX_FIELD_PATTERNS = {
+    "device_version": re.compile(rb"Device version:[ \t]*([^<\n]+)"),
+    "airplay_version": re.compile(rb"AirPlay version:[ \t]*([^<\n]+)"),
+    "ip_cidr": re.compile(rb"IP:[ \t]*([\d.]+/\d+)"),
+    "gateway": re.compile(rb"Gateway:[ \t]*([\d.]+)"),
+    "dns": re.compile(rb"DNS:[ \t]*([^<\n]+)"),
+}
+
+
+class IndexPageParser:
+    """Incremental single-pass extractor for the index.fcgi fields.
+
+    ``feed`` takes raw chunks as they arrive and scans only complete lines, so
+    a field split across chunks is still found. Each byte is scanned once per
+    field still missing, and the first occurrence of each field wins.
+    ``consumed`` is the number of bytes scanned when the last field was found,
+    or the whole page after ``close``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._found: dict[str, bytes] = {}
+        self._missing = list(INDEX_FIELDS)
+        self._partial = b""
+        self.consumed = 0
+
+    @property
+    def done(self) -> bool:
+        """Return True once every field has been found."""
+        return not self._missing
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan the complete lines in ``chunk``; return True once every field is found."""
+        data = self._partial + chunk if self._partial else chunk
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        if end:
+            self._scan(data, end)
+            self.consumed += end
+        return self.done
+
+    def close(self) -> None:
+        """Scan whatever is left after the last newline."""
+        if self._partial and not self.done:
+            self._scan(self._partial, len(self._partial))
+            self.consumed += len(self._partial)
+        self._partial = b""
+
+    def _scan(self, data: bytes, end: int) -> None:
+        # Only fields still missing are searched for; found ones are never rescanned
+        for key in self._missing.copy():
+            if match := _INDEX_FIELD_PATTERNS[key].search(data, 0, end):
+                self._found[key] = match[1]
+                self._missing.remove(key)
+
+    def result(self) -> dict[str, str]:
+        """Return the fields found so far, decoded and trimmed."""
+        out = {}
+        for key in INDEX_FIELDS:
+            if (value := self._found.get(key)) is None:
+                continue
+            text = value.decode("utf-8", "replace").strip()
+            if key == "dns":
+                text = ", ".join(d.strip() for d in text.split(","))
+            out[key] = text
+        return out
+
+
+class IndexPageReader:
+    """Reads index.fcgi response bodies, reusing the last result when the page is unchanged.
+
+    Reading stops as soon as every field is found. The bytes read up to that
+    point are kept; the next read compares that many bytes and, if they are
+    equal, returns the cached result without scanning anything. Pages missing
+    a field are not cached.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the reader."""
+        self._prefix: bytes | None = None
+        self._result: dict[str, str] = {}
+        self.stats = {"parsed": 0, "cached": 0}
+        # Bytes received by the last read
+        self.last_read_bytes = 0
+
+    async def async_read(self, chunks: AsyncIterable[bytes]) -> dict[str, str]:
+        """Return the fields from a body such as ``resp.content.iter_any()``."""
+        parser = IndexPageParser()
+        received = bytearray()
+        prefix = self._prefix
+        checking = prefix is not None
+        async for chunk in chunks:
+            received += chunk
+            if not checking:
+                if parser.feed(chunk):
+                    break
+                continue
+            if len(received) < len(prefix):
+                continue
+            if received.startswith(prefix):
+                self.last_read_bytes = len(received)
+                self.stats["cached"] += 1
+                return dict(self._result)
+            # Page changed; scan everything held back while comparing
+            checking = False
+            if parser.feed(bytes(received)):
+                break
+        else:
+            if checking:
+                parser.feed(bytes(received))
+            parser.close()
+
+        self.last_read_bytes = len(received)
+        self.stats["parsed"] += 1
+        self._result = parser.result()
+        # A page missing fields may still be booting; always scan it again
+        self._prefix = bytes(received[: parser.consumed]) if parser.done else None
+        return dict(self._result)
@@ -0,0 +1,98 @@
+"""Indexed input registry for JBL 4305P."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from .api import bluetooth_mac_from_path
+
+
+def normalize_mac(mac: str) -> str:
+    """Return ``mac`` lowercase and colon-separated, accepting ``_`` or ``-`` separators."""
+    return mac.replace("_", ":").replace("-", ":").lower()
+
+
+class JBL4305PInputRegistry:
+    """The selectable inputs of one speaker, with precomputed lookups.
+
+    Shared by the select, sensors, buttons and services. Indexes by name,
+    Bluetooth MAC and device path, and the list of option names, are rebuilt
+    only when ``async_set_inputs`` receives a different input list; listeners
+    run after each change.
+    """
+
+    def __init__(self, inputs: dict[str, dict[str, Any]] | None = None) -> None:
+        """Initialize the registry."""
+        self._inputs: dict[str, dict[str, Any]] = {}
+        self._by_name: dict[str, str] = {}
+        self._by_mac: dict[str, str] = {}
+        self._by_device_path: dict[str, str] = {}
+        self.options: list[str] = []
+        self.bluetooth_device_paths: list[str] = []
+        self._listeners: list[Callable[[], None]] = []
+        self.rebuilds = 0
+        if inputs:
+            self._rebuild(inputs)
+
+    @property
+    def inputs(self) -> dict[str, dict[str, Any]]:
+        """Return the input list keyed by input ID; treat as read-only."""
+        return self._inputs
+
+    def __len__(self) -> int:
+        return len(self._inputs)
+
+    def __contains__(self, input_id: object) -> bool:
+        return input_id in self._inputs
+
+    def get(self, input_id: str | None) -> dict[str, Any] | None:
+        """Return the input info for an ID."""
+        return self._inputs.get(input_id) if input_id else None
+
+    def name_for(self, input_id: str | None) -> str | None:
+        """Return the display name of an input ID."""
+        info = self.get(input_id)
+        return info["name"] if info else None
+
+    def id_for_name(self, name: str) -> str | None:
+        """Return the input ID shown as ``name``."""
+        return self._by_name.get(name)
+
+    def id_for_mac(self, mac: str | None) -> str | None:
+        """Return the input ID of a Bluetooth device by MAC."""
+        return self._by_mac.get(normalize_mac(mac)) if mac else None
+
+    def id_for_device_path(self, device_path: str | None) -> str | None:
+        """Return the input ID of a Bluetooth device by BlueZ path."""
+        return self._by_device_path.get(device_path) if device_path else None
+
+    def async_set_inputs(self, inputs: dict[str, dict[str, Any]]) -> bool:
+        """Replace the input list; return False (and keep the indexes) if unchanged."""
+        if inputs == self._inputs:
+            return False
+        self._rebuild(inputs)
+        for listener in list(self._listeners):
+            listener()
+        return True
+
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` after every change; returns a function that removes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _rebuild(self, inputs: dict[str, dict[str, Any]]) -> None:
+        self._inputs = dict(inputs)
+        self._by_name = {}
+        self._by_mac = {}
+        self._by_device_path = {}
+        for input_id, info in self._inputs.items():
+            # First input wins if two share a display name, matching the old linear scan
+            self._by_name.setdefault(info["name"], input_id)
+            if device_path := info.get("device_path"):
+                self._by_device_path[device_path] = input_id
+                if mac := bluetooth_mac_from_path(device_path):
+                    self._by_mac[mac] = input_id
+        self.options = list(self._by_name)
+        self.bluetooth_device_paths = list(self._by_device_path)
+        self.rebuilds += 1
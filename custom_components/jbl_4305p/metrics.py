@@ -0,0 +1,184 @@
+"""Request instrumentation for JBL 4305P speakers."""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+ENDPOINT_GET_DATA = "getData"
+ENDPOINT_SET_DATA = "setData"
+ENDPOINT_INDEX = "index.fcgi"
+
+# Reported latency quantiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Streaming quantile estimate over positive values, in the style of DDSketch.
+
+    Values fall into log-spaced buckets, so every reported quantile is within
+    ``relative_accuracy`` of a value that was actually added. Memory grows
+    with the logarithm of the value range, not with the number of values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        """Initialize an empty sketch."""
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Add one value."""
+        self.count += 1
+        if value <= 0:
+            self._zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float | None:
+        """Return the estimated ``q`` quantile (0-1), or None if no values were added."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+                return 2 * self._gamma**index / (self._gamma + 1)
+        return None
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """Counters for one endpoint or NSDK path.
+
+    ``nsdk_errors`` counts replies carrying an NSDK error payload, such as
+    the path of a service the speaker does not have. The request itself
+    worked, so they are not counted in ``errors``.
+    """
+
+    requests: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+    nsdk_errors: int = 0
+    bytes: int = 0
+    latency: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def record(
+        self, seconds: float, nbytes: int, error: str | None, nsdk_error: bool = False
+    ) -> None:
+        """Count one request; ``error`` is the error type name if it failed."""
+        self.requests += 1
+        self.bytes += nbytes
+        self.latency.add(seconds * 1000)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        elif nsdk_error:
+            self.nsdk_errors += 1
+
+    def latency_ms(self, q: float) -> float | None:
+        """Return the estimated ``q`` latency quantile in milliseconds."""
+        value = self.latency.quantile(q)
+        return None if value is None else round(value, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and latency quantiles as plain data."""
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "nsdk_errors": self.nsdk_errors,
+            "bytes": self.bytes,
+            "latency_ms": {f"p{round(q * 100)}": self.latency_ms(q) for q in QUANTILES},
+        }
+
+
+class RequestTimer:
+    """Times one request and records it on exit.
+
+    Set ``bytes`` to the response size, ``error`` to flag a failure that did
+    not raise, and ``nsdk_error`` when the speaker answered with an NSDK
+    error payload. An exception leaving the block is recorded by type name.
+    """
+
+    __slots__ = ("_metrics", "_endpoint", "_path", "_started", "bytes", "error", "nsdk_error")
+
+    def __init__(self, metrics: RequestMetrics, endpoint: str, path: str | None) -> None:
+        """Initialize the timer."""
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._path = path
+        self._started = 0.0
+        self.bytes = 0
+        self.error: str | None = None
+        self.nsdk_error = False
+
+    def __enter__(self) -> RequestTimer:
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        error = type(exc).__name__ if exc is not None else self.error
+        self._metrics.record(
+            self._endpoint,
+            self._path,
+            time.monotonic() - self._started,
+            self.bytes,
+            error,
+            self.nsdk_error,
+        )
+
+
+class RequestMetrics:
+    """Request counts, errors by type, bytes and latency per endpoint and per NSDK path."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: dict[str, RequestStats] = {}
+        self.paths: dict[str, RequestStats] = {}
+
+    def time(self, endpoint: str, path: str | None = None) -> RequestTimer:
+        """Return a context manager that records one request to ``endpoint``."""
+        return RequestTimer(self, endpoint, path)
+
+    def record(
+        self,
+        endpoint: str,
+        path: str | None,
+        seconds: float,
+        nbytes: int = 0,
+        error: str | None = None,
+        nsdk_error: bool = False,
+    ) -> None:
+        """Count one request that took ``seconds`` and returned ``nbytes``."""
+        if (stats := self.endpoints.get(endpoint)) is None:
+            stats = self.endpoints[endpoint] = RequestStats()
+        stats.record(seconds, nbytes, error, nsdk_error)
+        if path is not None:
+            if (stats := self.paths.get(path)) is None:
+                stats = self.paths[path] = RequestStats()
+            stats.record(seconds, nbytes, error, nsdk_error)
+
+    @property
+    def errors(self) -> int:
+        """Return the total number of failed requests."""
+        return sum(sum(stats.errors.values()) for stats in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all counters as plain data, e.g. for diagnostics."""
+        return {
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+            "paths": {name: stats.as_dict() for name, stats in self.paths.items()},
+        }
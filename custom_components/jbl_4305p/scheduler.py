@@ -0,0 +1,166 @@
+"""Adaptive poll interval scheduling for JBL 4305P."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Hashable
+from typing import Any
+
+from .const import (
+    BACKOFF_JITTER,
+    COMMAND_BOOST_WINDOW,
+    FLEET_MAX_CONCURRENT_REQUESTS,
+    IDLE_STRETCH_AFTER,
+)
+from .metrics import QUANTILES, QuantileSketch
+
+
+class AdaptivePollScheduler:
+    """Pick the next poll interval from recent commands, playback and reachability.
+
+    - Right after a user command: ``min_interval`` so the change is picked up quickly.
+    - Playing, paused or recently stopped: the configured ``base_interval``.
+    - Stopped for a long time: doubled every ``IDLE_STRETCH_AFTER`` seconds up to ``max_interval``.
+    - Unreachable: exponential backoff from ``base_interval`` with jitter, up to ``max_interval``.
+    """
+
+    def __init__(self, base_interval: float, min_interval: float, max_interval: float) -> None:
+        """Initialize the scheduler; intervals are in seconds."""
+        self.set_intervals(base_interval, min_interval, max_interval)
+        self._boost_until = 0.0
+        self._stopped_since: float | None = None
+        self._failures = 0
+
+    def set_intervals(self, base_interval: float, min_interval: float, max_interval: float) -> None:
+        """Change the configured intervals, keeping command, idle and backoff state."""
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.base_interval = self._clamp(base_interval)
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def note_command(self, now: float | None = None) -> None:
+        """Record a user command; polling runs at ``min_interval`` for a short while."""
+        now = time.monotonic() if now is None else now
+        self._boost_until = now + COMMAND_BOOST_WINDOW
+
+    def next_interval(self, state: str | None, reachable: bool, now: float | None = None) -> float:
+        """Return the number of seconds until the next poll."""
+        now = time.monotonic() if now is None else now
+
+        if not reachable:
+            self._failures += 1
+            backoff = self.base_interval * 2 ** (self._failures - 1)
+            return self._clamp(backoff * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER))
+        self._failures = 0
+
+        if state == "stopped":
+            if self._stopped_since is None:
+                self._stopped_since = now
+        else:
+            self._stopped_since = None
+
+        if now < self._boost_until:
+            return self.min_interval
+
+        if self._stopped_since is not None:
+            idle_steps = int((now - self._stopped_since) // IDLE_STRETCH_AFTER)
+            return self._clamp(self.base_interval * 2 ** min(idle_steps, 16))
+
+        return self.base_interval
+
+
+class FleetScheduler:
+    """Stagger the polls of all speakers and bound their requests in flight.
+
+    Every registered poller gets a phase: of N pollers, the n-th polls
+    ``n / N`` of the way through its interval, on a grid shared by the whole
+    fleet. Speakers with the same interval therefore take turns instead of
+    all polling together after a restart. ``request_slots`` is shared by the
+    clients of all speakers and caps the requests in flight across the fleet.
+
+    Each poll cycle records how late it started (timed polls only), how long
+    it took and its event-loop time: how long the cycle's own synchronous
+    steps held the loop, not counting time spent awaiting the speaker.
+    """
+
+    def __init__(self, max_concurrent_requests: int = FLEET_MAX_CONCURRENT_REQUESTS) -> None:
+        """Initialize an empty fleet."""
+        self.request_slots = asyncio.Semaphore(max_concurrent_requests)
+        self._members: list[Hashable] = []
+        self._last_cycle: dict[Hashable, dict[str, float]] = {}
+        self.cycles = 0
+        # Milliseconds, over all pollers
+        self.lag = QuantileSketch()
+        self.loop_time = QuantileSketch()
+
+    def __len__(self) -> int:
+        """Return the number of registered pollers."""
+        return len(self._members)
+
+    def register(self, member: Hashable) -> None:
+        """Add a poller; the phases of all pollers are spread again."""
+        if member not in self._members:
+            self._members.append(member)
+
+    def unregister(self, member: Hashable) -> None:
+        """Remove a poller."""
+        if member in self._members:
+            self._members.remove(member)
+        self._last_cycle.pop(member, None)
+
+    def phase(self, member: Hashable) -> float:
+        """Return the fraction (0-1) of its interval at which ``member`` polls."""
+        return self._members.index(member) / len(self._members)
+
+    def next_poll(self, member: Hashable, interval: float, now: float) -> float:
+        """Return when ``member`` should next poll, given its ``interval`` and the time ``now``.
+
+        The result is the point of ``member``'s phase nearest to ``now +
+        interval``, so the wait is between half and one and a half intervals.
+        Unregistered pollers simply wait ``interval``.
+        """
+        if member not in self._members or interval <= 0:
+            return now + interval
+        offset = self.phase(member) * interval
+        return round((now + interval - offset) / interval) * interval + offset
+
+    def record_cycle(
+        self, member: Hashable, lag: float | None, duration: float, loop_time: float
+    ) -> None:
+        """Record one poll cycle in seconds; ``lag`` is None unless it was a timed poll."""
+        self.cycles += 1
+        if lag is not None:
+            self.lag.add(lag * 1000)
+        self.loop_time.add(loop_time * 1000)
+        self._last_cycle[member] = {
+            "lag_ms": None if lag is None else round(lag * 1000, 1),
+            "duration_ms": round(duration * 1000, 1),
+            "loop_time_ms": round(loop_time * 1000, 3),
+        }
+
+    def as_dict(self, member: Hashable | None = None) -> dict[str, Any]:
+        """Return fleet counters as plain data, with ``member``'s phase and last cycle."""
+        data: dict[str, Any] = {
+            "pollers": len(self._members),
+            "cycles": self.cycles,
+            "lag_ms": _quantiles(self.lag),
+            "loop_time_ms": _quantiles(self.loop_time, 3),
+        }
+        if member is not None and member in self._members:
+            data["phase"] = round(self.phase(member), 3)
+            data["last_cycle"] = self._last_cycle.get(member)
+        return data
+
+
+def _quantiles(sketch: QuantileSketch, digits: int = 1) -> dict[str, float | None]:
+    """Return the reported quantiles of ``sketch``, rounded to ``digits`` decimals."""
+    return {
+        f"p{round(q * 100)}": None
+        if (value := sketch.quantile(q)) is None
+        else round(value, digits)
+        for q in QUANTILES
+    }
@@ -8,10 +8,14 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .api import JBL4305PApiError
 from .const import DOMAIN, LOGGER
 from .coordinator import JBL4305PDataUpdateCoordinator
+from .entity import JBL4305PCoordinatorEntity
+
+# Shown until inputs have been discovered
+DEFAULT_OPTIONS = ["Google Cast", "Bluetooth"]
 
 
 async def async_setup_entry(
@@ -23,36 +27,47 @@ async def async_setup_entry(
     coordinator: JBL4305PDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     client = hass.data[DOMAIN][entry.entry_id]["client"]
 
-    # Get available inputs from options
-    available_inputs = entry.options.get("available_inputs", {})
+    async_add_entities([JBL4305PInputSelect(coordinator, client, entry)])
 
-    if not available_inputs:
-        # Fallback: discover inputs if none stored
+    # Inputs come from options or the persistent cache (see async_setup_entry)
+    if not coordinator.inputs:
+        # Fallback: discover inputs if none stored, without holding up setup
         LOGGER.warning("No inputs found in config, discovering...")
-        available_inputs = await client.discover_available_inputs()
+        entry.async_create_background_task(
+            hass, _async_discover_inputs(coordinator, client), f"{entry.title} discovery"
+        )
+
 
-    async_add_entities([JBL4305PInputSelect(coordinator, client, entry, available_inputs)])
+async def _async_discover_inputs(coordinator: JBL4305PDataUpdateCoordinator, client: Any) -> None:
+    """Discover inputs and hand them to the input registry."""
+    # Reuse the player state snapshot from the first refresh
+    player = (coordinator.data or {}).get("player")
+    try:
+        available_inputs = await client.discover_available_inputs(player)
+    except JBL4305PApiError as err:
+        LOGGER.warning("Input discovery failed, use the rediscover_inputs service: %s", err)
+        return
+    coordinator.inputs.async_set_inputs(available_inputs)
 
 
-class JBL4305PInputSelect(CoordinatorEntity[JBL4305PDataUpdateCoordinator], SelectEntity):
+class JBL4305PInputSelect(JBL4305PCoordinatorEntity[JBL4305PDataUpdateCoordinator], SelectEntity):
     """Representation of a JBL 4305P input select."""
 
     _attr_has_entity_name = True
     _attr_name = "Input Source"
     _attr_icon = "mdi:speaker"
+    _fields = frozenset({("current_input",)})
 
     def __init__(
         self,
         coordinator: JBL4305PDataUpdateCoordinator,
         client: Any,
         entry: ConfigEntry,
-        available_inputs: dict[str, dict[str, Any]],
     ) -> None:
         """Initialize the select entity."""
         super().__init__(coordinator)
         self._client = client
         self._entry = entry
-        self._available_inputs = available_inputs
         self._attr_unique_id = f"{entry.entry_id}_input_source"
         self._attr_device_info = {
             "identifiers": {(DOMAIN, entry.entry_id)},
@@ -61,37 +76,25 @@ class JBL4305PInputSelect(CoordinatorEntity[JBL4305PDataUpdateCoordinator], Sele
             "model": "4305P",
         }
 
+    async def async_added_to_hass(self) -> None:
+        """Follow input list changes from options, services and discovery."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.inputs.async_add_listener(self.async_write_ha_state))
+
     @property
     def options(self) -> list[str]:
         """Return list of available input options."""
-        return [info["name"] for info in self._available_inputs.values()] or [
-            "Google Cast",
-            "Bluetooth",
-        ]
+        return self.coordinator.inputs.options or DEFAULT_OPTIONS
 
     @property
     def current_option(self) -> str | None:
         """Return the current selected input."""
         data = self.coordinator.data or {}
-        current_input_id = data.get("current_input")
-
-        if not current_input_id:
-            return None
-
-        # Find the input info by ID
-        input_info = self._available_inputs.get(current_input_id)
-        return input_info["name"] if input_info else None
+        return self.coordinator.inputs.name_for(data.get("current_input"))
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected input."""
-        # Find the input ID by name
-        input_info = None
-
-        for _inp_id, info in self._available_inputs.items():
-            if info["name"] == option:
-                input_info = info
-                break
-
+        input_info = self.coordinator.inputs.get(self.coordinator.inputs.id_for_name(option))
         if not input_info:
             LOGGER.error("Unknown input option: %s", option)
             return
@@ -101,10 +104,6 @@ class JBL4305PInputSelect(CoordinatorEntity[JBL4305PDataUpdateCoordinator], Sele
 
         LOGGER.info("Switching to input: %s (service: %s)", option, service_id)
 
-        success = await self._client.switch_input(service_id, device_path)
-
-        if success:
-            # Update coordinator data
-            await self.coordinator.async_request_refresh()
-        else:
+        # Queued: rapid selections collapse into one write and one refresh
+        if not await self.coordinator.async_switch_input(service_id, device_path):
             LOGGER.error("Failed to switch input to: %s", option)
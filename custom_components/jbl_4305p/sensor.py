@@ -2,28 +2,36 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import Any
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ENTITY_CATEGORY_DIAGNOSTIC
+from homeassistant.const import ENTITY_CATEGORY_DIAGNOSTIC, UnitOfTime
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import JBL4305PDataUpdateCoordinator
+from .coordinator import JBL4305PCoordinator, JBL4305PDataUpdateCoordinator
+from .entity import JBL4305PCoordinatorEntity
+from .metrics import ENDPOINT_GET_DATA, RequestMetrics
 
+# Only the request metrics sensors poll; they read counters the client keeps in memory
+SCAN_INTERVAL = timedelta(seconds=60)
+
+# (key, name, device class, coordinator: "system" for NSDK settings, "versions" for index.fcgi)
 SENSORS = [
-    ("device_version", "Device Version", None),
-    ("airplay_version", "AirPlay Version", None),
-    ("cast_version", "Cast Version", None),
-    ("ip_cidr", "IP (CIDR)", None),
-    ("gateway", "Gateway", None),
-    ("dns", "DNS", None),
-    ("mac", "MAC Address", None),
-    ("serial", "Serial Number", None),
-    ("uptime", "Device Uptime", SensorDeviceClass.DURATION),
+    ("device_version", "Device Version", None, "versions"),
+    ("airplay_version", "AirPlay Version", None, "versions"),
+    ("cast_version", "Cast Version", None, "system"),
+    ("ip_cidr", "IP (CIDR)", None, "versions"),
+    ("gateway", "Gateway", None, "versions"),
+    ("dns", "DNS", None, "versions"),
+    ("device_name", "Speaker Name", None, "system"),
+    ("mac", "MAC Address", None, "system"),
+    ("serial", "Serial Number", None, "system"),
+    ("boot_time", "Last Boot", SensorDeviceClass.TIMESTAMP, "system"),
 ]
 
 
@@ -34,25 +42,38 @@ async def async_setup_entry(
 ) -> None:
     coordinator: JBL4305PDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
-    entities: list[JBL4305PSensor] = []
+    # Device Uptime was replaced by the Last Boot timestamp
+    registry = er.async_get(hass)
+    if entity_id := registry.async_get_entity_id("sensor", DOMAIN, f"{entry.entry_id}_uptime"):
+        registry.async_remove(entity_id)
+
+    entities: list[SensorEntity] = []
 
-    for key, name, device_class in SENSORS:
-        entities.append(JBL4305PSensor(coordinator, entry, key, name, device_class))
+    for key, name, device_class, source in SENSORS:
+        # Each diagnostic sensor follows only the coordinator that fetches its value
+        entities.append(
+            JBL4305PSensor(getattr(coordinator, source), entry, key, name, device_class)
+        )
 
     # Current input sensor
     entities.append(JBL4305PCurrentInputSensor(coordinator, entry))
 
+    # Request instrumentation, disabled by default
+    metrics = hass.data[DOMAIN][entry.entry_id]["client"].metrics
+    entities.append(JBL4305PRequestLatencySensor(metrics, entry))
+    entities.append(JBL4305PRequestErrorsSensor(metrics, entry))
+
     async_add_entities(entities)
 
 
-class JBL4305PSensor(CoordinatorEntity[JBL4305PDataUpdateCoordinator], SensorEntity):
-    """Generic sensor for system/version/network info."""
+class JBL4305PSensor(JBL4305PCoordinatorEntity[JBL4305PCoordinator], SensorEntity):
+    """Generic sensor for system/version/network info from a diagnostics coordinator."""
 
     _attr_entity_category = ENTITY_CATEGORY_DIAGNOSTIC
 
     def __init__(
         self,
-        coordinator: JBL4305PDataUpdateCoordinator,
+        coordinator: JBL4305PCoordinator,
         entry: ConfigEntry,
         key: str,
         name: str,
@@ -61,6 +82,7 @@ class JBL4305PSensor(CoordinatorEntity[JBL4305PDataUpdateCoordinator], SensorEnt
         super().__init__(coordinator)
         self._entry = entry
         self._key = key
+        self._fields = frozenset({(key,)})
         self._attr_name = name
         self._attr_unique_id = f"{entry.entry_id}_{key}"
         if device_class:
@@ -74,21 +96,17 @@ class JBL4305PSensor(CoordinatorEntity[JBL4305PDataUpdateCoordinator], SensorEnt
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        # Prefer NSDK system info values
-        sys_info = data.get("system", {})
-        if self._key in sys_info:
-            return sys_info.get(self._key)
-        # Fallback to parsed versions/network info
-        vers = data.get("versions", {})
-        return vers.get(self._key)
+        return (self.coordinator.data or {}).get(self._key)
 
 
-class JBL4305PCurrentInputSensor(CoordinatorEntity[JBL4305PDataUpdateCoordinator], SensorEntity):
+class JBL4305PCurrentInputSensor(
+    JBL4305PCoordinatorEntity[JBL4305PDataUpdateCoordinator], SensorEntity
+):
     """Expose current input as a sensor."""
 
     _attr_has_entity_name = True
     _attr_name = "Current Input"
+    _fields = frozenset({("current_input",)})
 
     def __init__(self, coordinator: JBL4305PDataUpdateCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator)
@@ -101,14 +119,81 @@ class JBL4305PCurrentInputSensor(CoordinatorEntity[JBL4305PDataUpdateCoordinator
             "model": "4305P",
         }
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Input names may change without a coordinator update
+        self.async_on_remove(self.coordinator.inputs.async_add_listener(self.async_write_ha_state))
+
     @property
     def native_value(self):
         data = self.coordinator.data or {}
         current_id = data.get("current_input")
         if not current_id:
             return None
-        # Map to friendly name from options
-        inputs = self._entry.options.get("available_inputs", {})
-        if current_id in inputs:
-            return inputs[current_id].get("name")
-        return current_id
+        # Map to friendly name from the input registry
+        return self.coordinator.inputs.name_for(current_id) or current_id
+
+
+class JBL4305PRequestMetricsSensor(SensorEntity):
+    """Base for sensors reading the client's request metrics."""
+
+    _attr_entity_category = ENTITY_CATEGORY_DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+    _attr_should_poll = True
+    _key: str
+
+    def __init__(self, metrics: RequestMetrics, entry: ConfigEntry) -> None:
+        self._metrics = metrics
+        self._attr_unique_id = f"{entry.entry_id}_{self._key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.data.get("name", "JBL 4305P"),
+            "manufacturer": "JBL",
+            "model": "4305P",
+        }
+
+
+class JBL4305PRequestLatencySensor(JBL4305PRequestMetricsSensor):
+    """95th percentile getData latency, with the median and 99th percentile as attributes."""
+
+    _attr_name = "Request Latency"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _key = "request_latency_p95"
+
+    @property
+    def native_value(self) -> float | None:
+        stats = self._metrics.endpoints.get(ENDPOINT_GET_DATA)
+        return stats.latency_ms(0.95) if stats else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if (stats := self._metrics.endpoints.get(ENDPOINT_GET_DATA)) is None:
+            return None
+        return {
+            "requests": stats.requests,
+            "p50": stats.latency_ms(0.5),
+            "p99": stats.latency_ms(0.99),
+        }
+
+
+class JBL4305PRequestErrorsSensor(JBL4305PRequestMetricsSensor):
+    """Failed requests since startup, broken down by error type in the attributes."""
+
+    _attr_name = "Request Errors"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _key = "request_errors"
+
+    @property
+    def native_value(self) -> int:
+        return self._metrics.errors
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        by_type: dict[str, int] = {}
+        for stats in self._metrics.endpoints.values():
+            for error, count in stats.errors.items():
+                by_type[error] = by_type.get(error, 0) + count
+        return by_type
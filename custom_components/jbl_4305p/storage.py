@@ -0,0 +1,41 @@
+"""Persistent cache of device facts and discovered inputs for JBL 4305P."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+
+
+class JBL4305PDeviceCache:
+    """Last known system facts, versions and discovered inputs for one speaker.
+
+    Loaded at setup so entities can start from cached values while the
+    speaker is revalidated in the background. Saves are debounced.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}", private=True
+        )
+        self.data: dict[str, Any] = {}
+
+    async def async_load(self) -> dict[str, Any]:
+        """Load cached data from disk."""
+        self.data = await self._store.async_load() or {}
+        return self.data
+
+    def async_update(self, **values: Any) -> None:
+        """Merge ``values`` into the cache and schedule a save if anything changed."""
+        if all(self.data.get(key) == value for key, value in values.items()):
+            return
+        self.data = {**self.data, **values}
+        self._store.async_delay_save(lambda: self.data, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the cache file."""
+        await self._store.async_remove()
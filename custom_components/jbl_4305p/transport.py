@@ -0,0 +1,123 @@
+"""Per-speaker HTTP transport for JBL 4305P."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+from .api import JBL4305PApiError, JBL4305PClient, request_deadline
+from .breaker import CIRCUIT_CLOSED
+from .const import (
+    DNS_CACHE_TTL,
+    KEEP_WARM_INTERVAL,
+    KEEPALIVE_TIMEOUT,
+    LOGGER,
+    MAX_CONNECTIONS,
+    PATH_DEVICE_NAME,
+    PATH_EVENT_POLL_QUEUE,
+)
+
+
+class JBL4305PTransport:
+    """Dedicated keep-alive aiohttp session for one speaker.
+
+    The connector keeps connections open between polls, caps them at what the
+    embedded fcgi server tolerates and caches DNS. aiohttp already sets
+    TCP_NODELAY on every connection it opens. Connection creation and reuse are
+    counted through a trace config so the savings show up in ``stats``.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_connections: int = MAX_CONNECTIONS,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+    ) -> None:
+        """Initialize the transport; must be called from the event loop."""
+        self.base_url = f"http://{host}"
+        self._connections_created = 0
+        self._connections_reused = 0
+        self._requests = 0
+        self._last_activity = time.monotonic()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_request_end.append(self._on_request_end)
+
+        connector = aiohttp.TCPConnector(
+            limit=max_connections,
+            limit_per_host=max_connections,
+            use_dns_cache=True,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[trace_config],
+            # Ask any intermediary not to serve cached API responses
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return connection reuse counters."""
+        return {
+            "requests": self._requests,
+            "connections_created": self._connections_created,
+            "connections_reused": self._connections_reused,
+        }
+
+    async def _on_connection_create(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: object
+    ) -> None:
+        self._connections_created += 1
+
+    async def _on_connection_reuse(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: object
+    ) -> None:
+        self._connections_reused += 1
+
+    async def _on_request_end(
+        self,
+        session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        self._requests += 1
+        # The event queue long-poll returns at least every EVENT_POLL_TIMEOUT
+        # seconds but keeps only its own connection warm, not the pooled ones
+        if params.url.path != PATH_EVENT_POLL_QUEUE:
+            self._last_activity = time.monotonic()
+
+    async def async_keep_warm(
+        self, client: JBL4305PClient, interval: float = KEEP_WARM_INTERVAL
+    ) -> None:
+        """Issue a cheap read whenever the speaker has been idle for ``interval`` seconds.
+
+        The read goes through ``client`` so it shares its request slots and
+        metrics; it is skipped while the client's circuit is not closed.
+        """
+        while True:
+            idle = time.monotonic() - self._last_activity
+            if idle < interval:
+                await asyncio.sleep(interval - idle)
+                continue
+            if client.breaker.state() != CIRCUIT_CLOSED:
+                # The circuit's own probe decides when the speaker is back
+                self._last_activity = time.monotonic()
+                continue
+            try:
+                with request_deadline(5):
+                    await client.nsdk_get_data(PATH_DEVICE_NAME)
+            except JBL4305PApiError as err:
+                LOGGER.debug("Keep-warm request failed: %s", err)
+                # Do not retry in a tight loop against an offline speaker
+                self._last_activity = time.monotonic()
+
+    async def async_close(self) -> None:
+        """Close the session and its connections."""
+        await self.session.close()
@@ -1,8 +1,12 @@
 """Test fixtures for JBL 4305P tests."""
 
-import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+from nsdk_stub import NSDKStub
+
 
 @pytest.fixture
 def mock_aiohttp_session():
@@ -11,3 +15,14 @@ def mock_aiohttp_session():
     response = AsyncMock()
     session.get.return_value.__aenter__.return_value = response
     return session, response
+
+
+@pytest.fixture
+async def nsdk_stub():
+    """Run a local NSDK stub server; yields (stub, host, session)."""
+    stub = NSDKStub()
+    server = TestServer(stub.make_app())
+    await server.start_server()
+    async with aiohttp.ClientSession() as session:
+        yield stub, f"{server.host}:{server.port}", session
+    await server.close()
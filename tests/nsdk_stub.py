@@ -0,0 +1,152 @@
+"""Local aiohttp server emulating the speaker's NSDK HTTP API."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from typing import Any
+
+from aiohttp import web
+
+INDEX_PAGE = """<html><head><title>JBL 4305P</title></head><body>
+<h1>JBL 4305P</h1>
+<table>
+<tr><td>Device version: 22.14.1-7</td></tr>
+<tr><td>AirPlay version: 610.20.41</td></tr>
+<tr><td>IP: 192.168.1.75/24</td></tr>
+<tr><td>Gateway: 192.168.1.1</td></tr>
+<tr><td>DNS: 192.168.1.1, 8.8.8.8</td></tr>
+</table>
+</body></html>
+"""
+
+DEFAULT_VALUES: dict[str, Any] = {
+    "settings:/deviceName": {"type": "string_", "string_": "Lounge Speakers"},
+    "settings:/system/primaryMacAddress": {"type": "string_", "string_": "00:11:22:33:44:55"},
+    "settings:/system/serialNumber": {"type": "string_", "string_": "JBL4305P0001"},
+    "settings:/system/deviceUptime": {"type": "i64_", "i64_": 86400},
+    "settings:/googlecast/castVersion": {"type": "string_", "string_": "1.56.500000"},
+    "settings:/airplay": {"type": "bool_", "bool_": True},
+    "settings:/spotify": {"type": "bool_", "bool_": True},
+    "player:player/data": {
+        "state": "playing",
+        "mediaRoles": {
+            "title": "Chromecast built-in",
+            "mediaData": {"metaData": {"serviceID": "googlecast", "live": True}},
+        },
+    },
+}
+
+
+class NSDKStub:
+    """In-memory NSDK speaker: getData/setData, index.fcgi and the event queue endpoints.
+
+    ``latency`` and ``jitter`` (seconds) delay every response, and
+    ``failure_rate`` makes that fraction of requests fail with HTTP 503.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.values: dict[str, Any] = {}
+        self.index_page = INDEX_PAGE
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.subscriptions: dict[str, set[str]] = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+    def make_app(self) -> web.Application:
+        """Return the aiohttp application serving this stub."""
+        app = web.Application(middlewares=[self._conditions])
+        app.router.add_get("/api/getData", self._get_data)
+        app.router.add_get("/api/setData", self._set_data)
+        app.router.add_get("/api/event/modifyQueue", self._modify_queue)
+        app.router.add_get("/api/event/pollQueue", self._poll_queue)
+        app.router.add_get("/index.fcgi", self._index)
+        return app
+
+    def load_defaults(self) -> None:
+        """Populate the values of a typical speaker playing Google Cast."""
+        for path, value in DEFAULT_VALUES.items():
+            self.values[path] = json.loads(json.dumps(value))
+
+    def set_value(self, path: str, value: Any) -> None:
+        """Change a value on the speaker and notify subscribed queues."""
+        self.values[path] = value
+        for queue_id, paths in self.subscriptions.items():
+            if path in paths:
+                self.queues[queue_id].put_nowait(
+                    {"path": path, "itemType": "update", "itemValue": value}
+                )
+
+    def drop_queues(self) -> None:
+        """Forget all queues, as the speaker does after a reboot."""
+        self.queues.clear()
+        self.subscriptions.clear()
+
+    def count(self, path: str | None = None) -> int:
+        """Return the number of requests served, optionally for one endpoint path."""
+        return sum(1 for req_path, _ in self.requests if path is None or req_path == path)
+
+    @web.middleware
+    async def _conditions(self, request: web.Request, handler) -> web.StreamResponse:
+        """Record the request and apply configured latency and failures."""
+        self.requests.append((request.path, dict(request.query)))
+        if request.path != "/api/event/pollQueue":
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    async def _get_data(self, request: web.Request) -> web.Response:
+        path = request.query["path"]
+        if path not in self.values:
+            return web.json_response({"error": {"message": f"Path not found: {path}"}})
+        return web.json_response([self.values[path]])
+
+    async def _set_data(self, request: web.Request) -> web.Response:
+        path = request.query["path"]
+        value = json.loads(request.query.get("value", "null"))
+        if path == "player:player/control" and isinstance(value, dict):
+            # Emulate the player switching to the requested source
+            if value.get("control") == "play":
+                self.set_value("player:player/data", {"state": "playing", **value})
+        elif request.query.get("role") == "value":
+            self.set_value(path, value)
+        return web.json_response(None)
+
+    async def _index(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.index_page, content_type="text/html")
+
+    async def _modify_queue(self, request: web.Request) -> web.Response:
+        queue_id = request.query.get("queueId") or f"{{queue-{len(self.queues) + 1}}}"
+        self.queues.setdefault(queue_id, asyncio.Queue())
+        paths = self.subscriptions.setdefault(queue_id, set())
+        for item in json.loads(request.query.get("subscribe", "[]")):
+            paths.add(item["path"])
+        return web.json_response(queue_id)
+
+    async def _poll_queue(self, request: web.Request) -> web.Response:
+        queue = self.queues.get(request.query["queueId"])
+        if queue is None:
+            return web.json_response({"error": {"message": "Queue not found"}})
+
+        timeout = int(request.query.get("timeout", "25000")) / 1000
+        events = []
+        try:
+            events.append(await asyncio.wait_for(queue.get(), timeout))
+        except TimeoutError:
+            return web.json_response([])
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        return web.json_response(events)
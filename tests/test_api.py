@@ -1,14 +1,32 @@
 """Tests for JBL 4305P API client."""
 
+import asyncio
+import contextlib
+import json
 import os
 import sys
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 # Add custom_components to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
 
-from jbl_4305p.api import JBL4305PClient
+from jbl_4305p.api import (
+    JBL4305PClient,
+    JBL4305PConnectionError,
+    JBL4305PEventQueueError,
+    PlayerSnapshot,
+    bluetooth_device_from_state,
+    bluetooth_mac_from_path,
+    current_input_from_state,
+    request_deadline,
+)
+from jbl_4305p.breaker import CIRCUIT_CLOSED, CIRCUIT_OPEN
+from jbl_4305p.index_page import IndexPageParser
+from jbl_4305p.transport import JBL4305PTransport
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
 
 
 @pytest.mark.asyncio
@@ -116,3 +134,409 @@ async def test_get_current_input_bluetooth_with_device(mock_aiohttp_session):
     current = await client.get_current_input()
 
     assert current == "bluetooth_64_e7_d8_6d_ad_c3"
+
+
+class _SlowSession:
+    """Session stub that records how many requests are in flight at once."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        session = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                session.calls += 1
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                await asyncio.sleep(0.01)
+                response = MagicMock()
+                response.json = AsyncMock(return_value=session.payload)
+                response.read = AsyncMock(return_value=json.dumps(session.payload).encode())
+                return response
+
+            async def __aexit__(self, *exc):
+                session.in_flight -= 1
+
+        return _Ctx()
+
+
+@pytest.mark.asyncio
+async def test_get_system_info_fetches_concurrently_within_limit():
+    """System settings are fetched in parallel but never above the per-speaker limit."""
+    session = _SlowSession([{"string_": "ABC123", "type": "string_"}])
+
+    client = JBL4305PClient("192.168.1.75", session, max_concurrent_requests=2)
+    info = await client.get_system_info()
+
+    assert session.calls == 5
+    assert session.max_in_flight == 2
+    assert info["serial"] == "ABC123"
+
+
+@pytest.mark.asyncio
+async def test_fleet_slots_bound_requests_across_speakers():
+    """Speakers sharing fleet slots never have more requests in flight than the fleet allows."""
+    session = _SlowSession([{"string_": "ABC123", "type": "string_"}])
+    fleet_slots = asyncio.Semaphore(3)
+    clients = [
+        JBL4305PClient(f"192.168.1.{75 + i}", session, fleet_slots=fleet_slots) for i in range(3)
+    ]
+
+    await asyncio.gather(*(client.get_system_info() for client in clients))
+
+    assert session.calls == 15
+    assert session.max_in_flight == 3
+
+
+def test_derive_from_player_state_snapshot():
+    """Current input and Bluetooth device are derived without network access."""
+    state = {
+        "state": "paused",
+        "mediaRoles": {
+            "value": {"string_": "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3", "type": "string_"},
+            "title": "[TV] Lounge TV",
+            "mediaData": {"metaData": {"serviceID": "bluetooth"}},
+        },
+    }
+
+    assert current_input_from_state(state) == "bluetooth_64_e7_d8_6d_ad_c3"
+    assert bluetooth_device_from_state(state) == {
+        "path": "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3",
+        "mac": "64:e7:d8:6d:ad:c3",
+        "name": "[TV] Lounge TV",
+    }
+    assert current_input_from_state({**state, "state": "stopped"}) is None
+    assert current_input_from_state(None) is None
+    assert bluetooth_mac_from_path("/org/bluez/hci0") is None
+
+
+@pytest.mark.asyncio
+async def test_player_state_without_state_key_still_reports_its_input():
+    """Only a stopped player has no input; a payload missing ``state`` keeps its service."""
+    state = {
+        "mediaRoles": {
+            "value": {"string_": "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3", "type": "string_"},
+            "title": "Phone",
+            "mediaData": {"metaData": {"serviceID": "bluetooth"}},
+        },
+    }
+    client = JBL4305PClient("192.168.1.75", MagicMock())
+
+    assert current_input_from_state(state) == "bluetooth_64_e7_d8_6d_ad_c3"
+    assert list(await client.discover_bluetooth_devices(state)) == [
+        "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3"
+    ]
+    assert current_input_from_state({}) is None
+    assert await client.discover_bluetooth_devices({"state": "playing"}) == {}
+
+
+def test_player_snapshot_keeps_only_used_fields():
+    """Snapshots decode typed values once, drop metadata and compare by value."""
+    state = {
+        "state": {"type": "string_", "string_": "playing"},
+        "mediaRoles": {
+            "value": {"string_": "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3"},
+            "title": "Phone",
+            "mediaData": {
+                "metaData": {"serviceID": "bluetooth", "artwork": "x" * 100_000},
+                "resources": [{"uri": f"track{i}"} for i in range(1000)],
+            },
+        },
+    }
+
+    snapshot = PlayerSnapshot.from_state(state)
+
+    assert snapshot == PlayerSnapshot(
+        state="playing",
+        service_id="bluetooth",
+        device_path="/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3",
+        title="Phone",
+    )
+    assert snapshot.current_input == "bluetooth_64_e7_d8_6d_ad_c3"
+    assert PlayerSnapshot.from_state(snapshot) is snapshot
+    assert not hasattr(snapshot, "__dict__")
+    with pytest.raises(AttributeError):
+        snapshot.state = "stopped"
+    assert PlayerSnapshot.from_state(None) == PlayerSnapshot()
+
+
+@pytest.mark.asyncio
+async def test_discover_available_inputs_reuses_snapshot(mock_aiohttp_session):
+    """Discovery with a snapshot only probes services, never player data."""
+    session, response = mock_aiohttp_session
+    response.json.return_value = []
+
+    client = JBL4305PClient("192.168.1.75", session)
+    inputs = await client.discover_available_inputs({"state": "stopped"})
+
+    paths = [call.kwargs["params"]["path"] for call in session.get.call_args_list]
+    assert "player:player/data" not in paths
+    assert set(inputs) == {"googlecast", "bluetooth"}
+
+
+@pytest.mark.asyncio
+async def test_event_queue_subscribe_and_poll(nsdk_stub):
+    """Changes on the speaker are delivered through the event queue long-poll."""
+    stub, host, session = nsdk_stub
+    client = JBL4305PClient(host, session)
+
+    queue_id = await client.event_subscribe(["player:player/data"])
+    poll = asyncio.create_task(client.event_poll(queue_id, timeout=5))
+    await asyncio.sleep(0.05)
+    stub.set_value("player:player/data", {"state": "playing"})
+    events = await poll
+
+    assert events == [
+        {"path": "player:player/data", "itemType": "update", "itemValue": {"state": "playing"}}
+    ]
+
+    # Speaker forgot the queue (e.g. reboot): caller is told to resubscribe
+    stub.drop_queues()
+    with pytest.raises(JBL4305PEventQueueError):
+        await client.event_poll(queue_id, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_request():
+    """Identical concurrent reads are coalesced and briefly cached."""
+    session = _SlowSession([{"string_": "Lounge", "type": "string_"}])
+    client = JBL4305PClient("192.168.1.75", session)
+
+    results = await asyncio.gather(
+        *(client.nsdk_get_data("settings:/deviceName") for _ in range(3))
+    )
+    assert session.calls == 1
+    assert results[0] == results[1] == results[2]
+
+    # Served from the micro-cache right after
+    await client.nsdk_get_data("settings:/deviceName")
+    assert session.calls == 1
+    assert client.read_stats == {"hits": 3, "misses": 1, "in_flight": 0}
+
+    # A different path is a separate request
+    await client.nsdk_get_data("settings:/system/serialNumber")
+    assert session.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_read_racing_a_write_is_not_cached():
+    """A read in flight while a write runs may return pre-write data, so it is not reused."""
+    session = _SlowSession([{"string_": "Lounge", "type": "string_"}])
+    client = JBL4305PClient("192.168.1.75", session)
+
+    read = asyncio.create_task(client.nsdk_get_data("settings:/deviceName"))
+    await asyncio.sleep(0)
+    assert await client.nsdk_set_data("settings:/deviceName", "Kitchen", role="value")
+    await read
+    assert session.calls == 2
+
+    await client.nsdk_get_data("settings:/deviceName")
+    assert session.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_transport_reuses_keepalive_connection(nsdk_stub):
+    """Sequential requests to a speaker share one persistent connection."""
+    stub, host, _ = nsdk_stub
+    stub.set_value("settings:/deviceName", {"string_": "Lounge", "type": "string_"})
+    transport = JBL4305PTransport(host)
+    client = JBL4305PClient(host, transport.session, read_cache_ttl=0)
+
+    try:
+        for _ in range(3):
+            assert await client.get_device_name() == "Lounge"
+    finally:
+        await transport.async_close()
+
+    assert transport.stats == {"requests": 3, "connections_created": 1, "connections_reused": 2}
+
+
+@pytest.mark.asyncio
+async def test_keep_warm_goes_through_client_and_skips_open_circuit(nsdk_stub):
+    """Keep-warm reads are counted by the client and not sent while the circuit is open."""
+    stub, host, _ = nsdk_stub
+    stub.set_value("settings:/deviceName", {"string_": "Lounge", "type": "string_"})
+    transport = JBL4305PTransport(host)
+    client = JBL4305PClient(host, transport.session, read_cache_ttl=0)
+    keep_warm = asyncio.create_task(transport.async_keep_warm(client, interval=0.02))
+
+    try:
+        await asyncio.sleep(0.05)
+        assert stub.count("/api/getData") >= 1
+        assert client.metrics.paths["settings:/deviceName"].requests == stub.count("/api/getData")
+
+        for _ in range(client.breaker.failure_threshold):
+            client.breaker.record_failure()
+        sent = stub.count("/api/getData")
+        await asyncio.sleep(0.05)
+        assert stub.count("/api/getData") == sent
+        assert client.breaker.rejected == 0
+    finally:
+        keep_warm.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await keep_warm
+        await transport.async_close()
+
+
+@pytest.mark.asyncio
+async def test_keep_warm_fires_while_the_event_queue_long_poll_is_active(nsdk_stub):
+    """Event queue polls do not count as activity, so pooled connections are still refreshed."""
+    stub, host, _ = nsdk_stub
+    stub.set_value("settings:/deviceName", {"string_": "Lounge", "type": "string_"})
+    transport = JBL4305PTransport(host)
+    client = JBL4305PClient(host, transport.session, read_cache_ttl=0)
+    queue_id = await client.event_subscribe(["settings:/deviceName"])
+
+    async def long_poll():
+        while True:
+            await client.event_poll(queue_id, timeout=0.01)
+
+    push = asyncio.create_task(long_poll())
+    keep_warm = asyncio.create_task(transport.async_keep_warm(client, interval=0.05))
+    try:
+        await asyncio.sleep(0.2)
+        assert stub.count("/api/event/pollQueue") > 5
+        assert stub.count("/api/getData") >= 2
+    finally:
+        for task in (push, keep_warm):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await transport.async_close()
+
+
+@pytest.mark.asyncio
+async def test_discovery_probes_in_parallel_and_caches_capabilities(nsdk_stub):
+    """Services are probed concurrently once; repeat discoveries hit the cache."""
+    stub, host, session = nsdk_stub
+    stub.load_defaults()
+    stub.latency = 0.02
+    client = JBL4305PClient(host, session, read_cache_ttl=0)
+
+    inputs = await client.discover_available_inputs()
+    assert {"googlecast", "bluetooth", "airplay", "spotify"} == set(inputs)
+    assert stub.count("/api/getData") == 6
+
+    # Absent services (roon, tidal, upnp) are negatively cached as well
+    again = await client.discover_available_inputs()
+    assert again == inputs
+    assert stub.count("/api/getData") == 7
+
+    await client.discover_available_inputs(force=True)
+    assert stub.count("/api/getData") == 13
+
+
+def test_index_page_parser_streams_and_stops_early():
+    """Fields split across chunks are found and scanning stops after the last one."""
+    with open(os.path.join(FIXTURES, "index_fcgi_large.html"), "rb") as page:
+        body = page.read()
+
+    parser = IndexPageParser()
+    for start in range(0, len(body), 7):
+        if parser.feed(body[start : start + 7]):
+            break
+
+    assert parser.result() == {
+        "device_version": "22.14.1-7",
+        "airplay_version": "610.20.41",
+        "ip_cidr": "192.168.1.75/24",
+        "gateway": "192.168.1.1",
+        "dns": "192.168.1.1, 8.8.8.8",
+    }
+    assert parser.consumed < len(body) // 2
+
+
+@pytest.mark.asyncio
+async def test_versions_and_network_reuses_unchanged_page(nsdk_stub):
+    """An unchanged index.fcgi prefix returns the cached fields; a changed one is parsed."""
+    stub, host, session = nsdk_stub
+    client = JBL4305PClient(host, session)
+
+    first = await client.get_versions_and_network()
+    assert first["device_version"] == "22.14.1-7"
+    assert first["dns"] == "192.168.1.1, 8.8.8.8"
+    assert await client.get_versions_and_network() == first
+    assert client._index_reader.stats == {"parsed": 1, "cached": 1}
+
+    stub.index_page = stub.index_page.replace("22.14.1-7", "22.15.0-1")
+    assert (await client.get_versions_and_network())["device_version"] == "22.15.0-1"
+    assert client._index_reader.stats == {"parsed": 2, "cached": 1}
+
+    # A page missing fields is never cached
+    stub.index_page = "<html>booting</html>"
+    assert await client.get_versions_and_network() == {}
+    assert await client.get_versions_and_network() == {}
+    assert client._index_reader.stats == {"parsed": 4, "cached": 1}
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_recovers_with_probe(nsdk_stub):
+    """A silent speaker opens the circuit; requests then fail without I/O until a probe succeeds."""
+    stub, host, session = nsdk_stub
+    stub.load_defaults()
+    stub.latency = 0.2
+    client = JBL4305PClient(
+        host, session, read_cache_ttl=0, request_timeout=0.05, probe_timeout=0.05
+    )
+
+    for _ in range(2):
+        with pytest.raises(JBL4305PConnectionError):
+            await client.get_player_state()
+    assert client.breaker.state() == CIRCUIT_OPEN
+
+    # Open: all system reads are refused without reaching the speaker
+    before = stub.count()
+    assert await client.get_system_info() == {}
+    assert stub.count() == before
+    assert client.breaker.rejected == 5
+
+    # Half-open: concurrent callers share one probe, which still times out
+    client.breaker.reset_timeout = 0
+    assert await client.get_system_info() == {}
+    assert stub.count() == before + 1
+
+    # Speaker is back: the probe closes the circuit and the read goes through
+    stub.latency = 0
+    assert (await client.get_player_state())["state"] == "playing"
+    assert client.breaker.state() == CIRCUIT_CLOSED
+    assert client.breaker.trips == 1
+
+
+@pytest.mark.asyncio
+async def test_request_deadline_limits_a_cycle_without_tripping_the_breaker(nsdk_stub):
+    """Reads share the time left of the budget; once it is spent nothing is sent."""
+    stub, host, session = nsdk_stub
+    stub.load_defaults()
+    stub.latency = 0.3
+    client = JBL4305PClient(host, session, read_cache_ttl=0)
+
+    with request_deadline(0.05):
+        start = asyncio.get_running_loop().time()
+        assert await client.get_system_info() == {}
+        assert asyncio.get_running_loop().time() - start < 0.25
+        before = stub.count()
+        with pytest.raises(JBL4305PConnectionError):
+            await client.get_player_state()
+        assert stub.count() == before
+
+    assert client.breaker.state() == CIRCUIT_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_timeouts_at_a_budget_below_the_request_timeout_still_trip_the_breaker(nsdk_stub):
+    """A silent speaker opens the circuit even when every cycle ends at its deadline."""
+    stub, host, session = nsdk_stub
+    stub.load_defaults()
+    stub.latency = 5
+    client = JBL4305PClient(host, session, read_cache_ttl=0, request_timeout=1.0, probe_timeout=0.1)
+
+    for _ in range(client.breaker.failure_threshold):
+        with request_deadline(0.3), pytest.raises(JBL4305PConnectionError):
+            await client.get_player_state()
+
+    assert client.breaker.state() == CIRCUIT_OPEN
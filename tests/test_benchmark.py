@@ -0,0 +1,23 @@
+"""Smoke test for the benchmark suite."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from benchmark import TRACKED_METRICS, compare, run_benchmarks
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_all_metrics(monkeypatch):
+    """The suite runs end to end against the stub and flags regressions."""
+    monkeypatch.setattr("jbl_4305p.coordinator.COMMAND_CONFIRM_DELAY", 0)
+
+    results = await run_benchmarks(cycles=3, latency=0, jitter=0)
+
+    assert set(TRACKED_METRICS) <= set(results)
+    assert results["requests_per_cycle"] < results["requests_first_cycle"]
+    assert compare(results, results, tolerance=0.25) == []
+    assert compare({**results, "discovery_requests": 99}, results, 0.25)
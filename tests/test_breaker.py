@@ -0,0 +1,30 @@
+"""Tests for the per-speaker circuit breaker."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from jbl_4305p.breaker import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout():
+    """Consecutive failures open the circuit; it half-opens once the reset timeout passes."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure(now=0)
+    assert breaker.state(now=0) == CIRCUIT_CLOSED
+    breaker.record_failure(now=1)
+    assert breaker.state(now=1) == CIRCUIT_OPEN
+    assert breaker.state(now=31) == CIRCUIT_HALF_OPEN
+    assert breaker.trips == 1
+
+    # A failed probe re-opens it for another reset timeout without a new trip
+    breaker.record_failure(now=31)
+    assert breaker.state(now=60) == CIRCUIT_OPEN
+    assert breaker.trips == 1
+
+    breaker.record_success()
+    assert breaker.state(now=61) == CIRCUIT_CLOSED
+    breaker.record_failure(now=62)
+    assert breaker.state(now=62) == CIRCUIT_CLOSED
@@ -0,0 +1,76 @@
+"""Tests for the setData command queue."""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from jbl_4305p.commands import JBL4305PCommandQueue
+
+
+@pytest.mark.asyncio
+async def test_burst_collapses_to_last_write_and_one_refresh():
+    """Superseded writes to a path are dropped; the burst triggers one callback."""
+    client = AsyncMock()
+    client.nsdk_set_data.return_value = True
+    on_burst_done = AsyncMock()
+    queue = JBL4305PCommandQueue(client, on_burst_done, debounce=0.01)
+
+    results = await asyncio.gather(
+        queue.async_set_data("player:player/control", {"n": 1}),
+        queue.async_set_data("settings:/deviceName", "Lounge", role="value"),
+        queue.async_set_data("player:player/control", {"n": 2}),
+        queue.async_set_data("player:player/control", {"n": 3}),
+    )
+
+    assert results == [True, True, True, True]
+    assert [call.args for call in client.nsdk_set_data.await_args_list] == [
+        ("settings:/deviceName", "Lounge"),
+        ("player:player/control", {"n": 3}),
+    ]
+    assert queue.superseded == 2
+    on_burst_done.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_reported_to_all_waiters():
+    """Callers of a coalesced write all see its failure."""
+    client = AsyncMock()
+    client.nsdk_set_data.return_value = False
+    queue = JBL4305PCommandQueue(client, debounce=0.01)
+
+    results = await asyncio.gather(
+        queue.async_set_data("player:player/control", {"n": 1}),
+        queue.async_set_data("player:player/control", {"n": 2}),
+    )
+
+    assert results == [False, False]
+    client.nsdk_set_data.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_a_running_flush_and_its_burst_callback():
+    """Unloading mid-flush cancels the write in progress and skips the burst callback."""
+    client = AsyncMock()
+    sending = asyncio.Event()
+
+    async def slow_set_data(*args, **kwargs):
+        sending.set()
+        await asyncio.sleep(10)
+        return True
+
+    client.nsdk_set_data.side_effect = slow_set_data
+    on_burst_done = AsyncMock()
+    queue = JBL4305PCommandQueue(client, on_burst_done, debounce=0.01)
+
+    write = asyncio.create_task(queue.async_set_data("player:player/control", {"n": 1}))
+    await sending.wait()
+    await queue.async_cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await write
+    on_burst_done.assert_not_awaited()
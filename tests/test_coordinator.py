@@ -1,14 +1,24 @@
 """Tests for coordinator data handling."""
 
-import pytest
-import sys
+import asyncio
+import contextlib
 import os
-from unittest.mock import AsyncMock, MagicMock
+import sys
+import time
 from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
 
-from jbl_4305p.coordinator import JBL4305PDataUpdateCoordinator
+from jbl_4305p.api import JBL4305PClient, JBL4305PConnectionError, JBL4305PEventQueueError
+from jbl_4305p.const import EVENT_MAX_QUEUE_LOSSES
+from jbl_4305p.coordinator import JBL4305PDataUpdateCoordinator, JBL4305PSystemCoordinator
+from jbl_4305p.scheduler import FleetScheduler
+from jbl_4305p.sensor import JBL4305PSensor
 
 
 @pytest.mark.asyncio
@@ -25,7 +35,6 @@ async def test_coordinator_tracks_last_bluetooth_device():
             "mediaData": {"metaData": {"serviceID": "bluetooth"}},
         },
     }
-    mock_client.get_current_input.return_value = "bluetooth_64_e7_d8_6d_ad_c3"
     mock_client.get_system_info.return_value = {}
     mock_client.get_versions_and_network.return_value = {}
 
@@ -33,15 +42,403 @@ async def test_coordinator_tracks_last_bluetooth_device():
     data = await coordinator._async_update_data()
 
     assert data["last_bt_device_path"] == "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3"
+    assert data["current_input"] == "bluetooth_64_e7_d8_6d_ad_c3"
 
     # Second update: Google Cast (Bluetooth path should persist)
     mock_client.get_player_state.return_value = {
         "state": "playing",
         "mediaRoles": {"mediaData": {"metaData": {"serviceID": "googlecast"}}},
     }
-    mock_client.get_current_input.return_value = "googlecast"
 
     data = await coordinator._async_update_data()
 
+    # Current input is derived from the same snapshot, no extra request
+    assert data["current_input"] == "googlecast"
+    mock_client.get_current_input.assert_not_awaited()
+    assert mock_client.get_player_state.await_count == 2
+
     # Last Bluetooth path should still be stored
     assert data["last_bt_device_path"] == "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3"
+
+
+@pytest.mark.asyncio
+async def test_system_coordinator_tracks_boot_time_and_reboots():
+    """Uptime becomes a boot timestamp that only moves on drift; a later one is a reboot."""
+    mock_client = AsyncMock()
+    mock_client.get_system_info.return_value = {"serial": "ABC", "uptime": 500}
+    on_reboot = AsyncMock()
+
+    coordinator = JBL4305PSystemCoordinator(MagicMock(), mock_client, on_reboot=on_reboot)
+    coordinator.data = await coordinator._async_update_data()
+    boot_time = coordinator.data["boot_time"]
+    assert abs((dt_util.utcnow() - boot_time).total_seconds() - 500) < 5
+    assert "uptime" not in coordinator.data
+    assert coordinator.update_interval == timedelta(hours=1)
+
+    # Re-sync within the drift tolerance keeps the boot time
+    mock_client.get_system_info.return_value = {"serial": "ABC", "uptime": 510}
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.data == {"serial": "ABC", "boot_time": boot_time}
+    coordinator.hass.async_create_task.assert_not_called()
+
+    # Uptime went backwards: versions are refreshed
+    mock_client.get_system_info.return_value = {"serial": "ABC", "uptime": 5}
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.data["boot_time"] > boot_time
+    coordinator.hass.async_create_task.assert_called_once()
+    coordinator.hass.async_create_task.call_args.args[0].close()
+
+    # Nothing readable: the last data is served within the grace window, retried sooner
+    mock_client.get_system_info.return_value = {}
+    assert await coordinator._async_update_data() is coordinator.data
+    assert coordinator.stale
+    assert coordinator.update_interval == timedelta(minutes=5)
+
+    # Past the grace window the refresh fails
+    coordinator.stale_grace = 0
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+
+@pytest.mark.asyncio
+async def test_failed_versions_scrape_does_not_affect_player_coordinator():
+    """index.fcgi failures mark only the versions coordinator as failed."""
+    mock_client = AsyncMock()
+    mock_client.get_player_state.return_value = {"state": "stopped"}
+    mock_client.get_system_info.return_value = {"serial": "ABC", "uptime": 500}
+    mock_client.get_versions_and_network.return_value = {}
+
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), mock_client, 30)
+    await coordinator.async_refresh()
+    await coordinator.versions.async_refresh()
+
+    assert coordinator.last_update_success
+    assert not coordinator.versions.last_update_success
+    assert coordinator.versions.update_interval == timedelta(minutes=5)
+    mock_client.get_system_info.assert_not_awaited()
+
+    mock_client.get_versions_and_network.return_value = {"device_version": "1.0"}
+    await coordinator.versions.async_refresh()
+    assert coordinator.versions.data == {"device_version": "1.0"}
+    assert coordinator.versions.update_interval is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_starts_from_cached_facts_and_revalidates():
+    """Cached facts are served at once and confirmed by the startup refresh."""
+    mock_hass = MagicMock()
+    mock_client = AsyncMock()
+    mock_client.get_player_state.return_value = {"state": "stopped"}
+    mock_client.get_system_info.return_value = {"serial": "ABC", "uptime": 510}
+    mock_client.get_versions_and_network.return_value = {"device_version": "2.0"}
+    cache = MagicMock()
+
+    coordinator = JBL4305PDataUpdateCoordinator(mock_hass, mock_client, 30, cache=cache)
+    coordinator.async_restore({"system": {"serial": "ABC"}, "versions": {"device_version": "1.0"}})
+    assert coordinator.system.data == {"serial": "ABC"}
+    assert coordinator.versions.data == {"device_version": "1.0"}
+
+    await coordinator.async_complete_startup(time.monotonic())
+    assert coordinator.versions.data == {"device_version": "2.0"}
+    assert "boot_time" in coordinator.system.data
+    cache.async_update.assert_any_call(system={"serial": "ABC"})
+    cache.async_update.assert_any_call(versions={"device_version": "2.0"})
+
+
+@pytest.mark.asyncio
+async def test_startup_refresh_reads_player_state_only():
+    """Only player state is on the startup critical path; diagnostics load afterwards."""
+    mock_hass = MagicMock()
+    mock_client = AsyncMock()
+    mock_client.get_player_state.return_value = {"state": "stopped"}
+    mock_client.get_system_info.return_value = {"serial": "ABC", "uptime": 500}
+    mock_client.get_versions_and_network.return_value = {"device_version": "1.0"}
+
+    coordinator = JBL4305PDataUpdateCoordinator(mock_hass, mock_client, 30)
+    started = time.monotonic()
+    await coordinator.async_startup_refresh()
+    assert coordinator.data["state"] == "stopped"
+    mock_client.get_system_info.assert_not_awaited()
+    mock_client.get_versions_and_network.assert_not_awaited()
+    assert "critical_path" in coordinator.startup_timings
+
+    await coordinator.async_complete_startup(started)
+    assert coordinator.system.data["serial"] == "ABC"
+    assert coordinator.versions.data == {"device_version": "1.0"}
+    assert coordinator.startup_timings["complete"] >= coordinator.startup_timings["critical_path"]
+
+    # Player polls do not touch the diagnostics
+    await coordinator._async_update_data()
+    assert mock_client.get_system_info.await_count == 1
+    assert mock_client.get_versions_and_network.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_coordinator_applies_pushed_player_state(nsdk_stub):
+    """Event queue updates reach coordinator data without a poll."""
+    stub, host, session = nsdk_stub
+    stub.set_value("player:player/data", {"state": "stopped"})
+    client = JBL4305PClient(host, session)
+
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), client, 30)
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.data["current_input"] is None
+
+    listener = asyncio.create_task(coordinator._async_event_loop())
+    for _ in range(50):
+        if coordinator.push_active:
+            break
+        await asyncio.sleep(0.01)
+    assert coordinator.push_active
+    assert coordinator.update_interval.total_seconds() == 300
+
+    stub.set_value(
+        "player:player/data",
+        {"state": "playing", "mediaRoles": {"mediaData": {"metaData": {"serviceID": "airplay"}}}},
+    )
+    for _ in range(50):
+        if coordinator.data["current_input"] == "airplay":
+            break
+        await asyncio.sleep(0.01)
+
+    listener.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await listener
+
+    assert coordinator.data["current_input"] == "airplay"
+    assert coordinator.update_interval.total_seconds() == 30
+
+
+@pytest.mark.asyncio
+async def test_repeated_event_queue_loss_backs_off_then_falls_back_to_polling(monkeypatch):
+    """A queue that fails on every poll is resubscribed with backoff, then given up."""
+    monkeypatch.setattr("jbl_4305p.coordinator.EVENT_RETRY_DELAY", 0.01)
+    mock_client = AsyncMock()
+    mock_client.event_subscribe.return_value = "{queue-1}"
+    mock_client.event_poll.side_effect = JBL4305PEventQueueError("Queue not found")
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), mock_client, 30)
+    coordinator._async_resync_system = MagicMock()
+
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def record_sleep(delay):
+        sleeps.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr("jbl_4305p.coordinator.asyncio.sleep", record_sleep)
+    await asyncio.wait_for(coordinator._async_event_loop(), 1)
+
+    assert mock_client.event_subscribe.await_count == EVENT_MAX_QUEUE_LOSSES + 1
+    assert sleeps == [0.01 * 2**i for i in range(EVENT_MAX_QUEUE_LOSSES - 1)]
+    assert coordinator._async_resync_system.call_count == 1
+    assert not coordinator.push_active
+    assert coordinator.update_interval.total_seconds() == 30
+
+
+@pytest.mark.asyncio
+async def test_switch_input_is_applied_optimistically_and_confirmed(monkeypatch):
+    """The expected input shows immediately and is corrected by one targeted read."""
+    monkeypatch.setattr("jbl_4305p.coordinator.COMMAND_CONFIRM_DELAY", 0)
+    mock_client = AsyncMock()
+    mock_client.get_player_state.return_value = {"state": "stopped"}
+    mock_client.get_system_info.return_value = {}
+    mock_client.get_versions_and_network.return_value = {}
+    mock_client.nsdk_set_data.return_value = True
+
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), mock_client, 30)
+    coordinator.commands._debounce = 0
+    coordinator.data = await coordinator._async_update_data()
+    seen = []
+    coordinator.async_add_listener(lambda: seen.append(coordinator.data["current_input"]))
+    # Stopped for a long time: stretched interval
+    coordinator._apply_interval(300)
+
+    # Speaker ignores the command: optimistic value is rolled back after confirmation
+    assert await coordinator.async_switch_input("airplay")
+    assert coordinator.update_interval.total_seconds() == 10
+    await asyncio.sleep(0.05)
+
+    assert seen == ["airplay", None]
+    mock_client.get_versions_and_network.assert_not_awaited()
+    assert mock_client.get_player_state.await_count == 2
+
+
+def test_events_push_device_name_and_ignore_static_settings():
+    """A pushed speaker name reaches the system coordinator; static settings are not applied."""
+    mock_client = AsyncMock()
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), mock_client, 30)
+    coordinator.data = {}
+    coordinator.system.data = {"serial": "ABC", "cast_version": "1.56"}
+
+    coordinator._apply_events(
+        [
+            {"path": "settings:/deviceName", "itemValue": {"type": "string_", "string_": "Den"}},
+            {
+                "path": "settings:/googlecast/castVersion",
+                "itemValue": {"type": "string_", "string_": "2.0"},
+            },
+        ]
+    )
+
+    assert coordinator.system.data == {
+        "serial": "ABC",
+        "cast_version": "1.56",
+        "device_name": "Den",
+    }
+
+
+@pytest.mark.asyncio
+async def test_entities_skip_writes_when_their_fields_are_unchanged():
+    """Only entities whose fields changed write state; skipped writes are counted."""
+    mock_client = AsyncMock()
+    mock_client.get_system_info.return_value = {"serial": "ABC", "mac": "00:11", "uptime": 500}
+
+    coordinator = JBL4305PSystemCoordinator(MagicMock(), mock_client)
+    entry = MagicMock(entry_id="abc", data={})
+    serial = JBL4305PSensor(coordinator, entry, "serial", "Serial Number", None)
+    mac = JBL4305PSensor(coordinator, entry, "mac", "MAC Address", None)
+    for entity in (serial, mac):
+        entity.async_write_ha_state = MagicMock()
+        coordinator.async_add_listener(entity._handle_coordinator_update)
+
+    coordinator.async_set_updated_data(await coordinator._async_update_data())
+    assert serial.async_write_ha_state.call_count == 1
+    assert mac.async_write_ha_state.call_count == 1
+
+    mock_client.get_system_info.return_value = {"serial": "ABC", "mac": "00:22", "uptime": 500}
+    coordinator.async_set_updated_data(await coordinator._async_update_data())
+    assert serial.async_write_ha_state.call_count == 1
+    assert mac.async_write_ha_state.call_count == 2
+    assert coordinator.changed_fields == {("mac",)}
+    assert coordinator.write_stats == {"written": 3, "skipped": 1}
+
+    # Nothing changed: both writes are skipped
+    coordinator.async_set_updated_data(await coordinator._async_update_data())
+    assert coordinator.changed_fields == set()
+    assert coordinator.write_stats == {"written": 3, "skipped": 3}
+
+    # Losing the speaker changes availability, so every entity writes
+    coordinator.last_update_success = False
+    coordinator.async_update_listeners()
+    assert serial.async_write_ha_state.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_overlapping_refresh_is_skipped_and_partial_reads_keep_freshness():
+    """A refresh requested mid-cycle is skipped; fields missing from a partial read stay stale."""
+    release = asyncio.Event()
+    results = [{"serial": "ABC", "mac": "00:11", "uptime": 500}, {"mac": "00:22"}]
+
+    async def get_system_info():
+        await release.wait()
+        return results.pop(0)
+
+    mock_client = AsyncMock()
+    mock_client.get_system_info.side_effect = get_system_info
+    coordinator = JBL4305PSystemCoordinator(MagicMock(), mock_client)
+
+    first = asyncio.create_task(coordinator.async_refresh())
+    await asyncio.sleep(0)
+    await coordinator.async_refresh()
+    assert coordinator.skipped_refreshes == 1
+    release.set()
+    await first
+    assert mock_client.get_system_info.await_count == 1
+    stamped = dict(coordinator.field_updated)
+    assert stamped.keys() == {"serial", "mac", "boot_time"}
+
+    await asyncio.sleep(0.01)
+    await coordinator.async_refresh()
+    assert coordinator.data["serial"] == "ABC"
+    assert coordinator.data["mac"] == "00:22"
+    assert coordinator.field_updated["serial"] == stamped["serial"]
+    assert coordinator.field_updated["mac"] > stamped["mac"]
+
+
+@pytest.mark.asyncio
+async def test_unreachable_speaker_serves_last_data_until_grace_ends():
+    """Entities stay available with a data_as_of attribute until the snapshot is too old."""
+    mock_client = AsyncMock()
+    mock_client.get_player_state.return_value = {"state": "stopped"}
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), mock_client, 30, stale_grace=60)
+    coordinator.hass.is_stopping = False
+    sensor = JBL4305PSensor(coordinator, MagicMock(entry_id="e1"), "state", "State", None)
+    sensor.async_write_ha_state = MagicMock()
+    coordinator.async_add_listener(sensor._handle_coordinator_update)
+    await coordinator.async_refresh()
+    assert sensor.extra_state_attributes is None
+    writes = sensor.async_write_ha_state.call_count
+
+    mock_client.get_player_state.side_effect = JBL4305PConnectionError("timeout")
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.stale
+    assert sensor.available
+    assert sensor.extra_state_attributes == {"data_as_of": coordinator.data_updated}
+    # One write to show the attribute, none for the repeated failure
+    assert sensor.async_write_ha_state.call_count == writes + 1
+
+    coordinator.data_updated -= timedelta(seconds=61)
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert not sensor.available
+
+    # Recovery clears the staleness and resyncs system settings
+    mock_client.get_player_state.side_effect = None
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert not coordinator.stale
+    assert sensor.extra_state_attributes is None
+    coordinator.hass.async_create_task.call_args.args[0].close()
+
+
+@pytest.mark.asyncio
+async def test_fleet_staggers_timed_polls_and_records_cycles():
+    """Speakers refreshed together poll at different phases; each cycle is recorded."""
+    hass = MagicMock()
+    hass.loop = asyncio.get_running_loop()
+    hass.is_stopping = False
+    fleet = FleetScheduler()
+    coordinators = []
+    for host in ("192.168.1.75", "192.168.1.76"):
+        client = AsyncMock()
+        client.host = host
+        client.get_player_state.return_value = {"state": "playing", "trackRoles": {}}
+        coordinator = JBL4305PDataUpdateCoordinator(hass, client, 30, fleet=fleet)
+        fleet.register(coordinator)
+        coordinator.async_add_listener(lambda: None)
+        coordinators.append(coordinator)
+
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+    first, second = (coordinator._poll_due for coordinator in coordinators)
+    assert abs(abs(second - first) - 15) < 1e-6
+    # The phase is applied through the interval handed to HA's scheduler
+    now = hass.loop.time()
+    for coordinator in coordinators:
+        wait = coordinator.update_interval.total_seconds()
+        assert 15 <= wait <= 45
+        assert abs(now + wait - coordinator._poll_due) < 0.5
+
+    stats = fleet.as_dict(coordinators[0])
+    assert stats["cycles"] == 2
+    assert stats["last_cycle"]["lag_ms"] is None
+    assert 0 < stats["last_cycle"]["loop_time_ms"] < stats["last_cycle"]["duration_ms"] + 1
+
+    await coordinators[0]._async_refresh(log_failures=True, scheduled=True)
+    assert fleet.as_dict(coordinators[0])["last_cycle"]["lag_ms"] is not None
+    assert coordinators[0].client.get_player_state.await_count == 2
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+
+
+def test_update_budget_stays_below_the_minimum_scan_interval():
+    """A short minimum interval shortens the refresh budget, so refreshes do not overlap."""
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), AsyncMock(), 30, min_interval=5)
+    assert coordinator.update_budget == 4
+
+    coordinator.async_set_intervals(30, 20, 300)
+    assert coordinator.update_budget == 8
+    assert coordinator.system.update_budget == 8
@@ -0,0 +1,53 @@
+"""Tests for the input registry."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from jbl_4305p.inputs import JBL4305PInputRegistry
+
+INPUTS = {
+    "googlecast": {"service_id": "googlecast", "name": "Google Cast", "type": "googlecast"},
+    "bluetooth_64_e7_d8_6d_ad_c3": {
+        "service_id": "bluetooth",
+        "name": "Bluetooth - Phone",
+        "type": "bluetooth",
+        "device_path": "/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3",
+        "device_name": "Phone",
+    },
+}
+
+
+def test_registry_lookups():
+    """Inputs are found by ID, name, MAC and device path."""
+    registry = JBL4305PInputRegistry(INPUTS)
+
+    assert registry.options == ["Google Cast", "Bluetooth - Phone"]
+    assert registry.id_for_name("Bluetooth - Phone") == "bluetooth_64_e7_d8_6d_ad_c3"
+    assert registry.id_for_mac("64-E7-D8-6D-AD-C3") == "bluetooth_64_e7_d8_6d_ad_c3"
+    assert (
+        registry.id_for_device_path("/org/bluez/hci0/dev_64_E7_D8_6D_AD_C3")
+        == "bluetooth_64_e7_d8_6d_ad_c3"
+    )
+    assert registry.name_for("googlecast") == "Google Cast"
+    assert registry.name_for("airplay") is None
+    assert registry.id_for_name("AirPlay") is None
+
+
+def test_registry_rebuilds_and_notifies_only_on_change():
+    """Setting the same list again neither rebuilds the indexes nor notifies listeners."""
+    registry = JBL4305PInputRegistry()
+    calls = []
+    remove = registry.async_add_listener(lambda: calls.append(registry.options))
+
+    assert registry.async_set_inputs(INPUTS)
+    assert not registry.async_set_inputs(dict(INPUTS))
+    assert registry.rebuilds == 1
+    assert calls == [["Google Cast", "Bluetooth - Phone"]]
+
+    remove()
+    registry.async_set_inputs({"googlecast": INPUTS["googlecast"]})
+    assert len(calls) == 1
+    assert registry.options == ["Google Cast"]
+    assert registry.id_for_mac("64:e7:d8:6d:ad:c3") is None
@@ -0,0 +1,84 @@
+"""Tests for request instrumentation and diagnostics."""
+
+import os
+import random
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from jbl_4305p.api import JBL4305PClient
+from jbl_4305p.const import DOMAIN
+from jbl_4305p.coordinator import JBL4305PDataUpdateCoordinator
+from jbl_4305p.diagnostics import async_get_config_entry_diagnostics
+from jbl_4305p.metrics import QuantileSketch
+
+
+def test_quantile_sketch_stays_within_relative_accuracy():
+    """Quantiles of a skewed stream are within 1% of the exact values."""
+    rng = random.Random(1)
+    values = [rng.lognormvariate(3, 1) for _ in range(10000)] + [0.0] * 10
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[round(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+    assert sketch.quantile(0) == 0.0
+    assert QuantileSketch().quantile(0.5) is None
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_per_endpoint_and_path(nsdk_stub):
+    """Counts, bytes, latency and error types show up in the entry diagnostics."""
+    stub, host, session = nsdk_stub
+    stub.load_defaults()
+    client = JBL4305PClient(host, session, read_cache_ttl=0)
+
+    await client.get_player_state()
+    await client.get_player_state()
+    await client.get_versions_and_network()
+    stub.failure_rate = 1
+    await client.get_system_info(["serial"])
+
+    paths = client.metrics.paths
+    assert paths["player:player/data"].requests == 2
+    assert paths["player:player/data"].bytes > 0
+    assert paths["settings:/system/serialNumber"].errors == {"ClientResponseError": 1}
+    assert client.metrics.endpoints["index.fcgi"].bytes > 0
+    assert client.metrics.errors == 1
+
+    coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), client, 30)
+    hass = MagicMock()
+    entry = MagicMock(entry_id="e1", data={"host": host}, options={"available_inputs": {}})
+    transport = MagicMock(stats={"requests": 4})
+    hass.data = {
+        DOMAIN: {"e1": {"client": client, "coordinator": coordinator, "transport": transport}}
+    }
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"] == {"host": "**REDACTED**"}
+    assert diagnostics["client"]["circuit"]["state"] == "closed"
+    endpoint = diagnostics["client"]["requests"]["endpoints"]["getData"]
+    assert endpoint["requests"] == 3
+    assert endpoint["errors"] == {"ClientResponseError": 1}
+    assert set(endpoint["latency_ms"]) == {"p50", "p95", "p99"}
+    assert diagnostics["coordinators"]["player"]["skipped_refreshes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_nsdk_error_replies_are_not_counted_as_errors(nsdk_stub):
+    """Capability probes for absent services are answered, so they are not request errors."""
+    stub, host, session = nsdk_stub
+    stub.load_defaults()
+    client = JBL4305PClient(host, session, read_cache_ttl=0)
+
+    await client.discover_available_inputs()
+
+    assert client.metrics.errors == 0
+    assert client.metrics.endpoints["getData"].nsdk_errors == 3
+    assert client.metrics.as_dict()["endpoints"]["getData"]["nsdk_errors"] == 3
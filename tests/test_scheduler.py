@@ -0,0 +1,83 @@
+"""Tests for the adaptive poll scheduler."""
+
+import os
+import sys
+from itertools import pairwise
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from jbl_4305p.scheduler import AdaptivePollScheduler, FleetScheduler
+
+
+def test_scheduler_boosts_after_command_and_stretches_when_idle():
+    """Commands shorten the interval; a long stop lengthens it up to the max."""
+    scheduler = AdaptivePollScheduler(30, 10, 300)
+
+    assert scheduler.next_interval("playing", reachable=True, now=0) == 30
+
+    scheduler.note_command(now=100)
+    assert scheduler.next_interval("playing", reachable=True, now=110) == 10
+    assert scheduler.next_interval("playing", reachable=True, now=200) == 30
+
+    assert scheduler.next_interval("stopped", reachable=True, now=1000) == 30
+    assert scheduler.next_interval("stopped", reachable=True, now=1600) == 60
+    assert scheduler.next_interval("stopped", reachable=True, now=10000) == 300
+    assert scheduler.next_interval("playing", reachable=True, now=10010) == 30
+
+
+def test_scheduler_backs_off_exponentially_when_unreachable():
+    """Unreachable speakers are polled less often, within bounds and with jitter."""
+    scheduler = AdaptivePollScheduler(30, 10, 300)
+
+    intervals = [scheduler.next_interval(None, reachable=False, now=0) for _ in range(6)]
+
+    assert 24 <= intervals[0] <= 36
+    assert 48 <= intervals[1] <= 72
+    assert intervals[-1] == 300
+    assert scheduler.next_interval("playing", reachable=True, now=0) == 30
+
+
+def test_scheduler_intervals_change_in_place():
+    """New interval options apply without losing the command boost."""
+    scheduler = AdaptivePollScheduler(30, 10, 300)
+    scheduler.note_command(now=0)
+
+    scheduler.set_intervals(60, 5, 120)
+
+    assert scheduler.next_interval("playing", reachable=True, now=1) == 5
+    assert scheduler.next_interval("playing", reachable=True, now=100) == 60
+
+
+def test_fleet_spreads_polls_evenly_over_the_interval():
+    """Speakers that start together settle on evenly spaced phases of the shared interval."""
+    fleet = FleetScheduler()
+    speakers = ["a", "b", "c", "d"]
+    for speaker in speakers:
+        fleet.register(speaker)
+
+    # All first polls scheduled at the same instant, as after a restart
+    due = [fleet.next_poll(speaker, 30, now=1000.2) for speaker in speakers]
+    assert sorted(due) == due
+    assert [round(b - a, 6) for a, b in pairwise(due)] == [7.5, 7.5, 7.5]
+    assert all(15 <= when - 1000.2 <= 45 for when in due)
+
+    # Each later poll stays on its phase
+    assert fleet.next_poll("b", 30, now=due[1]) == due[1] + 30
+
+    fleet.unregister("d")
+    assert fleet.phase("c") == 2 / 3
+    assert fleet.next_poll("d", 30, now=1000.2) == 1030.2
+
+
+def test_fleet_reports_loop_time_per_cycle():
+    """Poll cycles are summarised fleet-wide and per speaker."""
+    fleet = FleetScheduler()
+    fleet.register("a")
+    fleet.record_cycle("a", lag=0.002, duration=0.050, loop_time=0.004)
+
+    stats = fleet.as_dict("a")
+    assert stats["pollers"] == 1
+    assert stats["cycles"] == 1
+    assert stats["phase"] == 0
+    assert stats["last_cycle"] == {"lag_ms": 2.0, "duration_ms": 50.0, "loop_time_ms": 4.0}
+    assert abs(stats["loop_time_ms"]["p95"] - 4.0) < 0.1
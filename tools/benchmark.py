@@ -0,0 +1,219 @@
+"""Benchmark JBL4305PClient and the coordinator against a local NSDK stub server.
+
+Usage:
+    python tools/benchmark.py                      # print results
+    python tools/benchmark.py --save               # write tools/benchmark_baseline.json
+    python tools/benchmark.py --compare            # exit 1 if slower than the baseline
+
+The stub adds ``--latency``/``--jitter`` to every response (default 50 +/- 10 ms)
+so numbers reflect request patterns rather than the machine running them.
+The ``index_parse_*`` metrics time the index.fcgi parser alone on the stub's
+page and ``tests/fixtures/index_fcgi_large.html``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import aiohttp
+from aiohttp.test_utils import TestServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "custom_components"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from jbl_4305p.api import JBL4305PClient  # noqa: E402
+from jbl_4305p.coordinator import JBL4305PDataUpdateCoordinator  # noqa: E402
+from jbl_4305p.index_page import IndexPageReader  # noqa: E402
+from nsdk_stub import INDEX_PAGE, NSDKStub  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+# Metrics where a higher value than the baseline is a regression
+TRACKED_METRICS = (
+    "poll_cycle_first_ms",
+    "poll_cycle_p50_ms",
+    "poll_cycle_p95_ms",
+    "requests_first_cycle",
+    "requests_per_cycle",
+    "command_optimistic_ms",
+    "command_confirmed_ms",
+    "discovery_ms",
+    "discovery_requests",
+    "discovery_repeat_ms",
+    "index_parse_small_us",
+    "index_parse_large_us",
+    "index_parse_cached_us",
+)
+
+# Sample index.fcgi pages for the parser micro-benchmarks
+INDEX_SAMPLES = {
+    "small": INDEX_PAGE.encode(),
+    "large": (ROOT / "tests" / "fixtures" / "index_fcgi_large.html").read_bytes(),
+}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def _wait_for(predicate, timeout: float = 10.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Condition not reached")
+        await asyncio.sleep(0.001)
+
+
+async def _chunks(body: bytes, size: int = 4096):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _time_index_read(reader: IndexPageReader, body: bytes, rounds: int) -> float:
+    """Return the median microseconds ``reader`` takes per page over ``rounds`` reads."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await reader.async_read(_chunks(body))
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+async def run_benchmarks(
+    cycles: int = 20,
+    latency: float = 0.05,
+    jitter: float = 0.01,
+    failure_rate: float = 0.0,
+) -> dict[str, float]:
+    """Run all scenarios against a fresh stub server and return the metrics."""
+    stub = NSDKStub(latency=latency, jitter=jitter, failure_rate=failure_rate, seed=1)
+    stub.load_defaults()
+    server = TestServer(stub.make_app())
+    await server.start_server()
+    host = f"{server.host}:{server.port}"
+    results: dict[str, float] = {}
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            # Poll cycles; the coordinator only needs hass for scheduling, which we drive here.
+            # Real cycles are seconds apart, so the read micro-cache is disabled.
+            client = JBL4305PClient(host, session, read_cache_ttl=0)
+            coordinator = JBL4305PDataUpdateCoordinator(MagicMock(), client, 30)
+            durations = []
+            requests = []
+            for cycle in range(cycles):
+                before = stub.count()
+                start = time.perf_counter()
+                if cycle == 0:
+                    # Startup: player state plus both diagnostics coordinators
+                    (
+                        coordinator.data,
+                        coordinator.system.data,
+                        coordinator.versions.data,
+                    ) = await asyncio.gather(
+                        coordinator._async_update_data(),
+                        coordinator.system._async_update_data(),
+                        coordinator.versions._async_update_data(),
+                    )
+                else:
+                    coordinator.data = await coordinator._async_update_data()
+                durations.append((time.perf_counter() - start) * 1000)
+                requests.append(stub.count() - before)
+                coordinator.last_update_success = True
+            results["poll_cycle_first_ms"] = durations[0]
+            results["poll_cycle_p50_ms"] = statistics.median(durations[1:])
+            results["poll_cycle_p95_ms"] = _percentile(durations[1:], 95)
+            results["requests_first_cycle"] = requests[0]
+            results["requests_per_cycle"] = statistics.mean(requests[1:])
+
+            # Command until the UI shows it, and until the speaker's state confirms it
+            shown = []
+            coordinator.async_add_listener(lambda: shown.append(time.perf_counter()))
+            start = time.perf_counter()
+            switch = asyncio.create_task(coordinator.async_switch_input("airplay"))
+            await _wait_for(lambda: bool(shown))
+            results["command_optimistic_ms"] = (shown[0] - start) * 1000
+            await switch
+            # The optimistic update only sets current_input; the snapshot comes from the speaker
+            await _wait_for(lambda: coordinator.data["player"].current_input == "airplay")
+            results["command_confirmed_ms"] = (time.perf_counter() - start) * 1000
+            await coordinator.async_shutdown()
+
+            # Input discovery on a fresh client
+            client = JBL4305PClient(host, session)
+            before = stub.count()
+            start = time.perf_counter()
+            await client.discover_available_inputs()
+            results["discovery_ms"] = (time.perf_counter() - start) * 1000
+            results["discovery_requests"] = stub.count() - before
+            start = time.perf_counter()
+            await client.discover_available_inputs()
+            results["discovery_repeat_ms"] = (time.perf_counter() - start) * 1000
+    finally:
+        await server.close()
+
+    # index.fcgi parsing; a fresh reader per round so nothing is served from its cache
+    for name, body in INDEX_SAMPLES.items():
+        timings = [await _time_index_read(IndexPageReader(), body, 1) for _ in range(200)]
+        results[f"index_parse_{name}_us"] = statistics.median(timings)
+    reader = IndexPageReader()
+    await reader.async_read(_chunks(INDEX_SAMPLES["large"]))
+    results["index_parse_cached_us"] = await _time_index_read(reader, INDEX_SAMPLES["large"], 200)
+
+    return {key: round(value, 2) for key, value in results.items()}
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Return a description of every tracked metric that regressed beyond ``tolerance``."""
+    regressions = []
+    for key in TRACKED_METRICS:
+        if key not in baseline or key not in results:
+            continue
+        # Small absolute slack so near-zero timings do not flap
+        limit = baseline[key] * (1 + tolerance) + 1
+        if results[key] > limit:
+            regressions.append(f"{key}: {results[key]} > {baseline[key]} (limit {limit:.2f})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.01, help="+/- seconds per response")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regression vs baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.cycles, args.latency, args.jitter, args.failure_rate))
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + os.linesep)
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+        if regressions := compare(results, baseline, args.tolerance):
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())